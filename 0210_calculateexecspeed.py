@@ -1,8 +1,43 @@
+import argparse
+import bisect
+import bz2
+import cProfile
 import csv
+import fnmatch
+import gc
+import glob
+import gzip
+import hashlib
+import heapq
+import importlib.util
+import io
+import json
+import lzma
+import tracemalloc
 import time
 import math
-from dataclasses import dataclass
-from typing import List, Dict, Tuple, Callable
+import mmap
+import operator
+import os
+import pickle
+import platform
+import re
+import shutil
+import sqlite3
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+from array import array
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date
+from functools import cached_property, lru_cache, partial
+from itertools import accumulate
+from typing import List, Dict, Set, Tuple, Callable, Iterable, Iterator
 
 
 # -----------------------------
@@ -16,12 +51,96 @@ class SaleRecord:
     product: str
 
 
+@dataclass(slots=True)
+class CompactSaleRecord:
+    """
+    Smaller SaleRecord: __slots__ instead of a per-instance __dict__, the date as a
+    day ordinal, the amount as integer cents and an interned product string.
+    Not frozen, because frozen slotted dataclasses assign fields via object.__setattr__.
+    sale_date/amount properties keep the SaleRecord-based operations working.
+    """
+    sale_id: int
+    date_ordinal: int   # date.toordinal()
+    amount_cents: int
+    product: str
+
+    @property
+    def sale_date(self) -> str:
+        return date.fromordinal(self.date_ordinal).isoformat()
+
+    @property
+    def amount(self) -> float:
+        return self.amount_cents / 100
+
+    def to_record(self) -> SaleRecord:
+        return SaleRecord(self.sale_id, self.sale_date, self.amount, self.product)
+
+
 # -----------------------------
 # Load CSV
 # -----------------------------
-def load_sales_csv(path: str) -> List[SaleRecord]:
+# Compressed inputs are decompressed while streaming, chosen by file suffix
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def is_compressed(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in COMPRESSED_OPENERS
+
+
+def plain_basename(path: str) -> str:
+    """File name with any compression suffix removed (x.csv.gz -> x.csv)."""
+    name = os.path.basename(path)
+    return os.path.splitext(name)[0] if is_compressed(name) else name
+
+
+def open_sales_file(path: str, binary: bool = False):
+    """Open a plain, .gz, .bz2 or .xz sales CSV as text (csv-ready) or bytes."""
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower())
+    if opener is None:
+        return open(path, "rb") if binary else open(path, "r", newline="", encoding="utf-8")
+    return opener(path, "rb") if binary else opener(path, "rt", newline="", encoding="utf-8")
+
+
+def read_decompressed(path: str, chunk_size: int = 1 << 20) -> int:
+    """Decompress (or just read) the whole file without parsing; returns the byte count."""
+    total = 0
+    with open_sales_file(path, binary=True) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return total
+            total += len(chunk)
+
+SALES_FIELDS = ["sale_id", "sale_date", "amount", "product"]
+
+
+def load_sales_csv(
+    path: str,
+    compact: bool = False,
+    backend: str = "dict",
+) -> List[SaleRecord] | List[CompactSaleRecord]:
+    """
+    compact=True returns CompactSaleRecord rows instead of SaleRecord.
+    backend picks the SaleRecord parser (see CSV_BACKENDS):
+    - "dict"  : csv.DictReader (any column order, slowest)
+    - "reader": csv.reader with column positions taken from the header
+    - "split" : bytes.split(b",") per line; requires exactly SALES_FIELDS, no quoting
+    - "bulk"  : whole file split into columns, then converted with map() per column
+    """
+    if compact:
+        if backend != "dict":
+            raise ValueError("compact=True only supports backend='dict'")
+        return _load_sales_csv_compact(path)
+    try:
+        parse = CSV_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"unknown CSV backend: {backend!r} (choose from {sorted(CSV_BACKENDS)})") from None
+    return parse(path)
+
+
+def _parse_dictreader(path: str) -> List[SaleRecord]:
     records: List[SaleRecord] = []
-    with open(path, "r", newline="", encoding="utf-8") as f:
+    with open_sales_file(path) as f:
         reader = csv.DictReader(f)
         for row in reader:
             records.append(
@@ -35,6 +154,296 @@ def load_sales_csv(path: str) -> List[SaleRecord]:
     return records
 
 
+def _parse_csv_reader(path: str) -> List[SaleRecord]:
+    with open_sales_file(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return []
+        i_id, i_date, i_amount, i_product = (header.index(name) for name in SALES_FIELDS)
+        return [
+            SaleRecord(int(row[i_id]), row[i_date], float(row[i_amount]), row[i_product])
+            for row in reader
+            if row
+        ]
+
+
+def _check_fixed_header(path: str, header: bytes) -> None:
+    fields = header.decode("utf-8").strip().split(",")
+    if fields != SALES_FIELDS:
+        raise ValueError(f"{path}: expected header {','.join(SALES_FIELDS)}, got {','.join(fields)}")
+
+
+def _parse_bytes_split(path: str) -> List[SaleRecord]:
+    records: List[SaleRecord] = []
+    append = records.append
+    with open_sales_file(path, binary=True) as f:
+        header = f.readline()
+        if not header:
+            return records
+        _check_fixed_header(path, header)
+        for line_no, line in enumerate(f, start=2):
+            parts = line.split(b",")
+            if len(parts) != 4:
+                if not line.rstrip(b"\r\n"):
+                    continue  # blank line, as csv.reader skips it
+                raise ValueError(f"{path}:{line_no}: expected 4 fields, got {len(parts)} (quoted fields are not supported)")
+            append(SaleRecord(
+                int(parts[0]),
+                parts[1].decode("ascii"),
+                float(parts[2]),
+                parts[3].rstrip(b"\r\n").decode("utf-8"),
+            ))
+    return records
+
+
+def _parse_bulk_columns(path: str) -> List[SaleRecord]:
+    # Whole-file version of the split parser: one split for all cells,
+    # then each column is converted with a single map() call
+    with open_sales_file(path, binary=True) as f:
+        header = f.readline()
+        if not header:
+            return []
+        _check_fixed_header(path, header)
+        data = f.read().decode("utf-8")
+    if '"' in data:
+        raise ValueError(f"{path}: quoted fields are not supported by the bulk backend")
+    # Blank lines (e.g. a trailing one) are dropped, as the other backends skip them
+    lines = [line for line in data.splitlines() if line]
+    if not lines:
+        return []
+    # Check per line: a short row next to a long one would otherwise realign
+    if any(line.count(",") != 3 for line in lines):
+        for line_no, line in enumerate(data.splitlines(), start=2):
+            if line and line.count(",") != 3:
+                raise ValueError(f"{path}:{line_no}: expected 4 fields, got {line.count(',') + 1}")
+    cells = ",".join(lines).split(",")
+    return list(map(
+        SaleRecord,
+        map(int, cells[0::4]),
+        cells[1::4],
+        map(float, cells[2::4]),
+        cells[3::4],
+    ))
+
+
+CSV_BACKENDS: Dict[str, Callable[[str], List[SaleRecord]]] = {
+    "dict": _parse_dictreader,
+    "reader": _parse_csv_reader,
+    "split": _parse_bytes_split,
+    "bulk": _parse_bulk_columns,
+}
+
+
+def _load_sales_csv_compact(path: str) -> List[CompactSaleRecord]:
+    records: List[CompactSaleRecord] = []
+    ordinals: Dict[str, int] = {}  # few distinct dates, so parse each one once
+    intern = sys.intern
+    with open_sales_file(path) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            sale_date = row["sale_date"]
+            ordinal = ordinals.get(sale_date)
+            if ordinal is None:
+                ordinal = ordinals[sale_date] = date.fromisoformat(sale_date).toordinal()
+            records.append(
+                CompactSaleRecord(
+                    int(row["sale_id"]),
+                    ordinal,
+                    round(float(row["amount"]) * 100),
+                    intern(row["product"]),
+                )
+            )
+    return records
+
+
+# -----------------------------
+# Columnar table
+# -----------------------------
+class SalesTable:
+    """
+    Column-oriented sales data.
+    One contiguous array per field instead of one SaleRecord object per row:
+    - sale_ids      : array('q')
+    - date_ordinals : array('i')  (date.toordinal(), so max/compare are int ops)
+    - amounts       : array('d')
+    - product_codes : array('i')  (index into product_names)
+    """
+
+    def __init__(self):
+        self.sale_ids = array("q")
+        self.date_ordinals = array("i")
+        self.amounts = array("d")
+        self.product_codes = array("i")
+        self.product_names: List[str] = []
+        self._product_index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.sale_ids)
+
+    def product_code(self, product: str) -> int:
+        code = self._product_index.get(product)
+        if code is None:
+            code = len(self.product_names)
+            self._product_index[product] = code
+            self.product_names.append(product)
+        return code
+
+    def product_name(self, code: int) -> str:
+        return self.product_names[code]
+
+    def append(self, sale_id: int, sale_date: str, amount: float, product: str) -> None:
+        self.sale_ids.append(sale_id)
+        self.date_ordinals.append(date.fromisoformat(sale_date).toordinal())
+        self.amounts.append(amount)
+        self.product_codes.append(self.product_code(product))
+
+    def row(self, i: int) -> SaleRecord:
+        # Materialize a single row back into the object form
+        return SaleRecord(
+            sale_id=self.sale_ids[i],
+            sale_date=date.fromordinal(self.date_ordinals[i]).isoformat(),
+            amount=self.amounts[i],
+            product=self.product_name(self.product_codes[i]),
+        )
+
+    @classmethod
+    def from_records(cls, records: List[SaleRecord]) -> "SalesTable":
+        table = cls()
+        for r in records:
+            table.append(r.sale_id, r.sale_date, r.amount, r.product)
+        return table
+
+
+def load_sales_table(path: str) -> SalesTable:
+    table = SalesTable()
+    with open_sales_file(path) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            table.append(
+                int(row["sale_id"]),
+                row["sale_date"],
+                float(row["amount"]),
+                row["product"],
+            )
+    return table
+
+
+# -----------------------------
+# Binary format (mmap)
+# -----------------------------
+# Layout (native byte order, every section 8-byte aligned):
+#   header         : magic, version, byteorder flag, n_rows, n_products
+#   sale_ids       : n_rows       * int64
+#   amounts        : n_rows       * float64
+#   date_ordinals  : n_rows       * int32
+#   product_codes  : n_rows       * int32
+#   name_offsets   : n_products+1 * int64  (byte offsets into name blob)
+#   name_blob      : utf-8 product names, concatenated
+BINARY_MAGIC = b"SALESBIN"
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<8sIIQQ")
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def convert_csv_to_binary(csv_path: str, bin_path: str) -> int:
+    """Parse the CSV once and write the binary format. Returns the row count."""
+    table = load_sales_table(csv_path)
+    encoded = [name.encode("utf-8") for name in table.product_names]
+    name_offsets = array("q", [0])
+    for b in encoded:
+        name_offsets.append(name_offsets[-1] + len(b))
+
+    sections = [
+        table.sale_ids.tobytes(),
+        table.amounts.tobytes(),
+        table.date_ordinals.tobytes(),
+        table.product_codes.tobytes(),
+        name_offsets.tobytes(),
+        b"".join(encoded),
+    ]
+    byteorder = 0 if sys.byteorder == "little" else 1
+    with open(bin_path, "wb") as f:
+        f.write(_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, byteorder, len(table), len(encoded)))
+        f.write(b"\0" * (_align8(_BINARY_HEADER.size) - _BINARY_HEADER.size))
+        for data in sections:
+            f.write(data)
+            f.write(b"\0" * (_align8(len(data)) - len(data)))
+    return len(table)
+
+
+class MappedSalesTable(SalesTable):
+    """
+    Read-only SalesTable whose columns are memoryviews over an mmap of the
+    binary file. Opening it only reads the header, so cost does not depend on N.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byteorder, n, n_products = _BINARY_HEADER.unpack_from(self._mm, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path}: not a sales binary file (version {BINARY_VERSION})")
+        if byteorder != (0 if sys.byteorder == "little" else 1):
+            self._mm.close()
+            raise ValueError(f"{path}: written on a machine with a different byte order")
+
+        self._views: List[memoryview] = []
+        offset = _align8(_BINARY_HEADER.size)
+        self.sale_ids, offset = self._column(offset, n, "q")
+        self.amounts, offset = self._column(offset, n, "d")
+        self.date_ordinals, offset = self._column(offset, n, "i")
+        self.product_codes, offset = self._column(offset, n, "i")
+        self._name_offsets, offset = self._column(offset, n_products + 1, "q")
+        self._name_base = offset
+        self.product_names = []  # names are decoded lazily from the blob
+        self._product_index = {}
+
+    def _column(self, offset: int, count: int, fmt: str) -> Tuple[memoryview, int]:
+        size = count * struct.calcsize(fmt)
+        raw = memoryview(self._mm)[offset:offset + size]
+        view = raw.cast(fmt)
+        self._views.extend([raw, view])
+        return view, offset + _align8(size)
+
+    def product_name(self, code: int) -> str:
+        start = self._name_base + self._name_offsets[code]
+        end = self._name_base + self._name_offsets[code + 1]
+        return self._mm[start:end].decode("utf-8")
+
+    def append(self, sale_id: int, sale_date: str, amount: float, product: str) -> None:
+        raise TypeError("MappedSalesTable is read-only")
+
+    def close(self) -> None:
+        # Exported memoryviews must be released before the mmap can close
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._mm.close()
+
+    def __enter__(self) -> "MappedSalesTable":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_sales_binary(path: str) -> MappedSalesTable:
+    return MappedSalesTable(path)
+
+
+def ensure_sales_binary(csv_path: str) -> str:
+    """Convert csv_path to a sibling .bin file unless an up-to-date one exists."""
+    bin_path = os.path.splitext(csv_path)[0] + ".bin"
+    if not os.path.exists(bin_path) or os.path.getmtime(bin_path) < os.path.getmtime(csv_path):
+        convert_csv_to_binary(csv_path, bin_path)
+    return bin_path
+
+
 # -----------------------------
 # Operations to benchmark
 # -----------------------------
@@ -62,130 +471,2481 @@ def search_sale_by_id_linear(records: List[SaleRecord], target_id: int) -> SaleR
             return r
     return None
 
+# CompactSaleRecord versions. has_duplicate_sale_ids and search_sale_by_id_linear
+# only touch sale_id and work on either record type as they are.
+def get_latest_sale_compact(records: List[CompactSaleRecord]) -> CompactSaleRecord:
+    # Integer compare instead of string compare (O(N))
+    return max(records, key=lambda r: r.date_ordinal)
+
+def compute_total_revenue_compact(records: List[CompactSaleRecord]) -> float:
+    # Exact integer sum, converted once (O(N))
+    return sum(r.amount_cents for r in records) / 100
+
+# Columnar versions: each one is a single C-level pass over one column.
+# operator.indexOf is used instead of .index so the same code works on
+# array columns and on memoryview columns from MappedSalesTable.
+def get_latest_sale_table(table: SalesTable) -> SaleRecord:
+    # max() then indexOf() returns the first row with the latest date (O(N))
+    return table.row(operator.indexOf(table.date_ordinals, max(table.date_ordinals)))
+
+def compute_total_revenue_table(table: SalesTable) -> float:
+    # Sum over a contiguous double array (O(N))
+    return sum(table.amounts)
+
+def has_duplicate_sale_ids_table(table: SalesTable) -> bool:
+    # Build the set in one call (O(N) average)
+    return len(set(table.sale_ids)) != len(table.sale_ids)
+
+def search_sale_by_id_table(table: SalesTable, target_id: int) -> SaleRecord | None:
+    # indexOf is a linear scan in C (O(N))
+    try:
+        return table.row(operator.indexOf(table.sale_ids, target_id))
+    except ValueError:
+        return None
+
 
 # -----------------------------
-# Benchmark helpers
+# Top-K (bounded heap)
 # -----------------------------
-def time_call(fn: Callable[[], object], runs: int = 5) -> float:
-    """Return average time in milliseconds."""
-    total = 0.0
-    for _ in range(runs):
-        start = time.perf_counter()
-        fn()
-        end = time.perf_counter()
-        total += (end - start)
-    return (total / runs) * 1000.0
+def top_k_sales(
+    records: Iterable[SaleRecord],
+    k: int,
+    key: Callable[[SaleRecord], object] = lambda r: r.amount,
+    largest: bool = True,
+) -> List[SaleRecord]:
+    """
+    k best records by key, best first, keeping at most k items in a heap (O(N log K)).
+    Accepts any iterable, so it runs on a list or straight off the streaming reader.
+    Ties keep file order, like sorted(..., reverse=True)[:k].
+    """
+    if largest:
+        return heapq.nlargest(k, records, key=key)
+    return heapq.nsmallest(k, records, key=key)
 
-def regression_slope_loglog(ns: List[int], ts_ms: List[float]) -> float:
+def most_recent_sales(records: Iterable[SaleRecord], k: int) -> List[SaleRecord]:
+    # k = 1 gives the same record as get_latest_sale
+    return top_k_sales(records, k, key=lambda r: r.sale_date)
+
+def top_k_sales_sorted(records: List[SaleRecord], k: int, key=lambda r: r.amount) -> List[SaleRecord]:
+    # Baseline: sort everything, keep k (O(N log N))
+    return sorted(records, key=key, reverse=True)[:k]
+
+def top_k_sales_stream(path: str, k: int, key=lambda r: r.amount, largest: bool = True) -> List[SaleRecord]:
+    # Only the current chunk and the k-item heap are in memory
+    return top_k_sales((r for chunk in iter_sales_csv(path) for r in chunk), k, key, largest)
+
+
+# -----------------------------
+# Streaming (single pass)
+# -----------------------------
+def iter_sales_csv(path: str, chunk_size: int = 10_000) -> Iterator[List[SaleRecord]]:
+    """Yield SaleRecords in chunks of at most chunk_size; only one chunk is alive at a time."""
+    with open_sales_file(path) as f:
+        reader = csv.DictReader(f)
+        chunk: List[SaleRecord] = []
+        for row in reader:
+            chunk.append(
+                SaleRecord(
+                    sale_id=int(row["sale_id"]),
+                    sale_date=row["sale_date"],
+                    amount=float(row["amount"]),
+                    product=row["product"],
+                )
+            )
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+@dataclass
+class SalesAggregate:
+    row_count: int = 0
+    total_revenue: float = 0.0
+    latest_sale: SaleRecord | None = None
+    has_duplicates: bool = False
+    found: SaleRecord | None = None   # first record matching target_id
+
+
+def aggregate_sales_stream(
+    chunks: Iterable[List[SaleRecord]],
+    target_id: int | None = None,
+) -> SalesAggregate:
     """
-    Estimate slope in log-log space (time ~ N^slope).
-    - slope ~ 1 : O(N)
-    - slope ~ 0 : O(1) (or dominated by constants)
-    - slope ~ 2 : O(N^2)
+    Compute latest sale, total revenue, duplicate check and id lookup in one pass.
+    Memory is one chunk plus the set of seen ids (needed for an exact duplicate check).
+    Results match the list-based operations (first max, same summation order).
     """
-    xs = [math.log(n) for n in ns]
-    ys = [math.log(max(t, 1e-12)) for t in ts_ms]  # avoid log(0)
-    x_mean = sum(xs) / len(xs)
-    y_mean = sum(ys) / len(ys)
-    num = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
-    den = sum((x - x_mean) ** 2 for x in xs)
-    return num / den if den != 0 else float("nan")
+    agg = SalesAggregate()
+    seen = set()
+    latest_date = ""
+    for chunk in chunks:
+        for r in chunk:
+            agg.row_count += 1
+            agg.total_revenue += r.amount
+            if agg.latest_sale is None or r.sale_date > latest_date:
+                agg.latest_sale = r
+                latest_date = r.sale_date
+            if not agg.has_duplicates:
+                if r.sale_id in seen:
+                    agg.has_duplicates = True
+                    seen = set()  # answer is known, stop growing the set
+                else:
+                    seen.add(r.sale_id)
+            if agg.found is None and r.sale_id == target_id:
+                agg.found = r
+    return agg
 
-def markdown_table(headers: List[str], rows: List[List[str]]) -> str:
-    line1 = "| " + " | ".join(headers) + " |"
-    line2 = "| " + " | ".join(["---"] * len(headers)) + " |"
-    lines = [line1, line2]
-    for r in rows:
-        lines.append("| " + " | ".join(r) + " |")
-    return "\n".join(lines)
+
+# -----------------------------
+# Probabilistic duplicate detection (bounded memory)
+# -----------------------------
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(x: int) -> int:
+    # splitmix64 finalizer: spreads consecutive ids over all 64 bits
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class BloomFilter:
+    """
+    Bit array sized for `capacity` items at false-positive rate `fp_rate`
+    (m = -n ln p / ln(2)^2 bits, k = m/n ln 2 hashes), using double hashing on _mix64.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = 0.01):
+        if not (0.0 < fp_rate < 1.0):
+            raise ValueError("fp_rate must be between 0.0 and 1.0 (exclusive)")
+        capacity = max(1, capacity)
+        self.num_bits = max(8, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def add(self, item: int) -> bool:
+        """Add item; return True if it was (probably) already present."""
+        h1 = _mix64(item)
+        h2 = _mix64(h1) | 1
+        m = self.num_bits
+        bits = self.bits
+        present = True
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % m
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        return present
+
+    def __contains__(self, item: int) -> bool:
+        h1 = _mix64(item)
+        h2 = _mix64(h1) | 1
+        m = self.num_bits
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in ((h1 + i * h2) % m for i in range(self.num_hashes)))
+
+
+class HyperLogLog:
+    """Distinct-count estimator with 2**precision one-byte registers (std. error ~ 1.04 / sqrt(2**precision))."""
+
+    def __init__(self, precision: int = 14):
+        if not (4 <= precision <= 18):
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, item: int) -> None:
+        h = _mix64(item)
+        idx = h >> (64 - self.precision)
+        rest = (h << self.precision) & _MASK64
+        rank = 64 - rest.bit_length() + 1 if rest else 64 - self.precision + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting for small cardinalities
+        return raw
+
+
+def find_duplicate_sale_ids_bloom(
+    make_ids: Callable[[], Iterable[int]],
+    capacity: int,
+    fp_rate: float = 0.01,
+    stop_at_first: bool = False,
+) -> Set[int]:
+    """
+    Two passes over the ids (make_ids must return a fresh iterable each call):
+    1. Bloom filter; every id it reports as already seen becomes a suspect
+       (true duplicates plus about fp_rate * N false positives).
+    2. Exact count of the suspects only, so the answer has no false positives.
+    Memory is the filter plus the suspect set, not one entry per id.
+    """
+    bloom = BloomFilter(capacity, fp_rate)
+    suspects = {i for i in make_ids() if bloom.add(i)}
+    if not suspects:
+        return set()
+    counted: Set[int] = set()
+    duplicates: Set[int] = set()
+    for i in make_ids():
+        if i in suspects:
+            if i in counted:
+                duplicates.add(i)
+                if stop_at_first:
+                    break
+            else:
+                counted.add(i)
+    return duplicates
+
+
+def has_duplicate_sale_ids_bloom(records: List[SaleRecord], fp_rate: float = 0.01) -> bool:
+    return bool(find_duplicate_sale_ids_bloom(
+        lambda: (r.sale_id for r in records), len(records), fp_rate, stop_at_first=True,
+    ))
+
+
+def iter_sale_ids(path: str, chunk_size: int = 10_000) -> Iterator[int]:
+    for chunk in iter_sales_csv(path, chunk_size):
+        for r in chunk:
+            yield r.sale_id
+
+
+def estimate_row_count(path: str, sample_bytes: int = 64 * 1024) -> int:
+    """Rough row count of a plain CSV from file size and the average line length of the first sample_bytes."""
+    with open(path, "rb") as f:
+        sample = f.read(sample_bytes)
+    lines = sample.count(b"\n")
+    if lines <= 1:
+        return max(1, lines)
+    return max(1, os.path.getsize(path) * lines // len(sample))
+
+
+def has_duplicate_sale_ids_bloom_stream(path: str, fp_rate: float = 0.01, capacity: int | None = None) -> bool:
+    """
+    Streaming version: reads the CSV twice at most. capacity defaults to an estimate
+    from file size, or to an exact count (one extra pass) for compressed files.
+    """
+    if capacity is None:
+        capacity = sum(1 for _ in iter_sale_ids(path)) if is_compressed(path) else estimate_row_count(path)
+    return bool(find_duplicate_sale_ids_bloom(lambda: iter_sale_ids(path), capacity, fp_rate, stop_at_first=True))
+
+
+def estimate_distinct_sale_ids(ids: Iterable[int], precision: int = 14) -> float:
+    hll = HyperLogLog(precision)
+    for i in ids:
+        hll.add(i)
+    return hll.estimate()
 
 
 # -----------------------------
-# Main
+# External-memory exact duplicate detection
 # -----------------------------
-def main():
-    files = [
-        ("100", "data/sales_100_product.csv"),
-        ("1000", "data/sales_1000_product.csv"),
-        ("10000", "data/sales_10000_product.csv"),
-        ("100000", "data/sales_100000_product.csv"),
-    ]
+SET_ENTRY_BYTES = 72  # rough cost of one int in a Python set (int object + hash slot)
 
-    Ns: List[int] = [int(label) for label, _ in files]
 
-    # Store times per operation
-    times: Dict[str, List[float]] = {
-        "Load (CSV -> list)": [],
-        "Retrieve latest sale": [],
-        "Compute total revenue": [],
-        "Check duplicate sale IDs": [],
-        "Search sale by ID (linear)": [],
-    }
+def _count_duplicates(ids: Iterable[int], out: Dict[int, int]) -> None:
+    counts: Dict[int, int] = {}
+    for i in ids:
+        counts[i] = counts.get(i, 0) + 1
+    for i, c in counts.items():
+        if c > 1:
+            out[i] = c
 
-    # For each dataset size, load + run ops
-    for label, path in files:
-        n = int(label)
 
-        # Measure load time (includes IO + parse)
-        load_ms = time_call(lambda: load_sales_csv(path), runs=3)
-        records = load_sales_csv(path)  # load once for the remaining ops
-        times["Load (CSV -> list)"].append(load_ms)
+def _partition_of(sale_id: int, level: int, fanout: int) -> int:
+    # Different salt per level so a partition that is still too big splits further
+    return _mix64(sale_id ^ (level * 0x632BE59BD9B4E019)) % fanout
 
-        # Choose an ID to search: existing (best to test typical successful search)
-        # Since your IDs are unique and generated 0..n-1 (duplicate_rate=0),
-        # pick one near the end to approximate worst-case for linear search.
-        target_id = n - 1
 
-        times["Retrieve latest sale"].append(time_call(lambda: get_latest_sale(records), runs=5))
-        times["Compute total revenue"].append(time_call(lambda: compute_total_revenue(records), runs=5))
-        times["Check duplicate sale IDs"].append(time_call(lambda: has_duplicate_sale_ids(records), runs=5))
-        times["Search sale by ID (linear)"].append(time_call(lambda: search_sale_by_id_linear(records, target_id), runs=5))
+def _spill_partitions(ids: Iterable[int], out_dir: str, level: int, fanout: int, buffer_ids: int) -> List[str]:
+    paths = [os.path.join(out_dir, f"part_{level}_{p}.bin") for p in range(fanout)]
+    files = [open(path, "wb") for path in paths]
+    buffers = [array("q") for _ in range(fanout)]
+    try:
+        for i in ids:
+            p = _partition_of(i, level, fanout)
+            buf = buffers[p]
+            buf.append(i)
+            if len(buf) >= buffer_ids:
+                buf.tofile(files[p])
+                del buf[:]
+        for p in range(fanout):
+            buffers[p].tofile(files[p])
+    finally:
+        for f in files:
+            f.close()
+    return paths
 
-    # -----------------------------
-    # Table 1: Raw timings (ms)
-    # -----------------------------
-    headers = ["Operation", "N=100", "N=1,000", "N=10,000", "N=100,000"]
-    rows = []
-    for op, ts in times.items():
-        rows.append([
-            op,
-            f"{ts[0]:.4f}",
-            f"{ts[1]:.4f}",
-            f"{ts[2]:.4f}",
-            f"{ts[3]:.4f}",
-        ])
 
-    print("\n=== Performance Trends: Execution Time (ms, avg) ===")
-    print(markdown_table(headers, rows))
+def _iter_spill_file(path: str, chunk_ids: int) -> Iterator[int]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = array("q")
+            chunk.frombytes(f.read(chunk_ids * 8))
+            if not chunk:
+                return
+            yield from chunk
 
-    # -----------------------------
-    # Table 2: Big-O expectation vs observed trend (log-log slope)
-    # -----------------------------
-    expected = {
-        "Load (CSV -> list)": "O(N)",
-        "Retrieve latest sale": "O(N)",
-        "Compute total revenue": "O(N)",
-        "Check duplicate sale IDs": "O(N) avg",
-        "Search sale by ID (linear)": "O(N)",
-    }
 
-    headers2 = ["Operation", "Expected Big-O", "Observed slope (log-log)", "Aligns? (trend)"]
-    rows2 = []
-    for op, ts in times.items():
-        slope = regression_slope_loglog(Ns, ts)
-        # Simple heuristic alignment check
-        exp = expected[op]
-        if "O(N)" in exp:
-            aligns = "Yes" if 0.7 <= slope <= 1.3 else "Maybe/No"
-        elif "O(1)" in exp:
-            aligns = "Yes" if -0.2 <= slope <= 0.3 else "Maybe/No"
+def _external_duplicates(ids: Iterable[int], out_dir: str, level: int, fanout: int,
+                         memory_budget_bytes: int, out: Dict[int, int]) -> None:
+    buffer_ids = max(1024, memory_budget_bytes // (8 * fanout))
+    for path in _spill_partitions(ids, out_dir, level, fanout, buffer_ids):
+        n = os.path.getsize(path) // 8
+        if n * SET_ENTRY_BYTES <= memory_budget_bytes or level >= 8:
+            with open(path, "rb") as f:
+                part = array("q")
+                part.frombytes(f.read())
+            _count_duplicates(part, out)
         else:
-            aligns = "Maybe"
+            # Still too big (or skewed): split this partition again with the next salt
+            _external_duplicates(_iter_spill_file(path, buffer_ids), out_dir, level + 1, fanout,
+                                 memory_budget_bytes, out)
+        os.remove(path)
 
-        rows2.append([op, exp, f"{slope:.2f}", aligns])
 
-    print("\n=== Big-O Alignment (trend-based) ===")
-    print(markdown_table(headers2, rows2))
+def find_duplicate_sale_ids_external(
+    ids: Iterable[int],
+    memory_budget_bytes: int = 64 * 1024 * 1024,
+    fanout: int = 16,
+    tmp_dir: str | None = None,
+) -> Dict[int, int]:
+    """
+    Exact duplicate report {sale_id: occurrences} for id streams larger than RAM.
+    Ids are buffered while they fit the budget; otherwise they are hash-partitioned
+    into `fanout` temporary spill files and each partition is counted on its own
+    (re-partitioned if it is still over budget). Equal ids always share a partition.
+    """
+    ids = iter(ids)
+    out: Dict[int, int] = {}
+    head = array("q")
+    limit = max(1, memory_budget_bytes // SET_ENTRY_BYTES)
+    for i in ids:
+        head.append(i)
+        if len(head) >= limit:
+            break
+    else:
+        _count_duplicates(head, out)  # everything fit in the budget
+        return out
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as spill_dir:
+        remaining = (i for chunk in (head, ids) for i in chunk)
+        _external_duplicates(remaining, spill_dir, 0, fanout, memory_budget_bytes, out)
+    return out
+
+
+def has_duplicate_sale_ids_external(records: List[SaleRecord], memory_budget_bytes: int = 64 * 1024 * 1024) -> bool:
+    return bool(find_duplicate_sale_ids_external((r.sale_id for r in records), memory_budget_bytes))
+
+
+# -----------------------------
+# Parallel load (byte-range splitting)
+# -----------------------------
+def split_byte_ranges(path: str, parts: int, min_range_bytes: int = 64 * 1024) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Return (header fieldnames, [(start, end), ...]) where every range starts at
+    the beginning of a line and ends just after a newline (or at EOF).
+    An empty file gives ([], []).
+    Assumes no quoted field contains a newline, which holds for the sales schema.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        if not header:
+            return [], []  # empty file: nothing to split
+        data_start = f.tell()
+        fieldnames = next(csv.reader([header.decode("utf-8")]))
+
+        parts = max(1, min(parts, (size - data_start) // min_range_bytes))
+        step = (size - data_start) // parts
+        bounds = [data_start]
+        for i in range(1, parts):
+            f.seek(data_start + i * step)
+            f.readline()  # move to the start of the next full line
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+        bounds.append(size)
+    return fieldnames, list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_byte_range(path: str, fieldnames: List[str], start: int, end: int) -> List[SaleRecord]:
+    # Runs in a worker process: read one range and parse it positionally
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    i_id = fieldnames.index("sale_id")
+    i_date = fieldnames.index("sale_date")
+    i_amount = fieldnames.index("amount")
+    i_product = fieldnames.index("product")
+    return [
+        SaleRecord(
+            sale_id=int(row[i_id]),
+            sale_date=row[i_date],
+            amount=float(row[i_amount]),
+            product=row[i_product],
+        )
+        for row in csv.reader(io.StringIO(text, newline=""))
+        if row
+    ]
+
+
+def load_sales_csv_parallel(
+    path: str,
+    workers: int | None = None,
+    executor: Executor | None = None,
+) -> List[SaleRecord]:
+    """
+    Same result as load_sales_csv, parsed by a process pool.
+    Pass an existing executor to avoid paying pool start-up on every call.
+    """
+    if is_compressed(path):
+        return _parse_csv_reader(path)  # compressed streams cannot be split by byte offset
+    workers = workers or os.cpu_count() or 1
+    fieldnames, ranges = split_byte_ranges(path, workers)
+    if not ranges:
+        return []
+    if len(ranges) == 1:
+        return _parse_byte_range(path, fieldnames, *ranges[0])
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(_parse_byte_range, path, fieldnames, start, end) for start, end in ranges]
+        records: List[SaleRecord] = []
+        for fut in futures:  # merge in file order
+            records.extend(fut.result())
+        return records
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+# -----------------------------
+# Parsed-dataset cache
+# -----------------------------
+CACHE_MAGIC = b"SALESPKL"
+
+
+class SalesDatasetCache:
+    """
+    Parsed SaleRecord lists stored under cache_dir, keyed by the CSV's absolute path,
+    size and mtime_ns. Each entry is a pickle (protocol 5) whose numeric columns are
+    out-of-band buffers written raw after it:
+        magic | u64 pickle size | pickle | (u64 size | raw bytes) per buffer
+    Entries are evicted least-recently-used first once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1 << 30):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _prefix(self, path: str) -> str:
+        return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+    def entry_path(self, path: str) -> str:
+        st = os.stat(path)
+        return os.path.join(self.cache_dir, f"{self._prefix(path)}-{st.st_size}-{st.st_mtime_ns}.pkl")
+
+    def get(self, path: str) -> List[SaleRecord] | None:
+        entry = self.entry_path(path)
+        try:
+            with open(entry, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if data[:8] != CACHE_MAGIC:
+            return None
+        view = memoryview(data)
+        (size,) = struct.unpack_from("<Q", data, 8)
+        pos = 16 + size
+        buffers = []
+        while pos < len(data):
+            (n,) = struct.unpack_from("<Q", data, pos)
+            buffers.append(view[pos + 8:pos + 8 + n])
+            pos += 8 + n
+        payload = pickle.loads(view[16:16 + size], buffers=buffers)
+        os.utime(entry)  # mark as recently used
+
+        ids = memoryview(payload["sale_ids"]).cast("q")
+        amounts = memoryview(payload["amounts"]).cast("d")
+        date_codes = memoryview(payload["date_codes"]).cast("i")
+        return list(map(
+            SaleRecord,
+            ids,
+            map(payload["dates"].__getitem__, date_codes),
+            amounts,
+            payload["products"],
+        ))
+
+    def put(self, path: str, records: List[SaleRecord]) -> None:
+        self.invalidate(path)  # drop entries for older versions of this file
+        date_index: Dict[str, int] = {}
+        date_codes = array("i", (date_index.setdefault(r.sale_date, len(date_index)) for r in records))
+        payload = {
+            "sale_ids": pickle.PickleBuffer(array("q", (r.sale_id for r in records))),
+            "amounts": pickle.PickleBuffer(array("d", (r.amount for r in records))),
+            "date_codes": pickle.PickleBuffer(date_codes),
+            "dates": list(date_index),
+            "products": [r.product for r in records],
+        }
+        buffers: List[pickle.PickleBuffer] = []
+        data = pickle.dumps(payload, protocol=5, buffer_callback=buffers.append)
+
+        entry = self.entry_path(path)
+        tmp = f"{entry}.{os.getpid()}-{threading.get_ident()}.tmp"  # unique per concurrent writer
+        with open(tmp, "wb") as f:
+            f.write(CACHE_MAGIC)
+            f.write(struct.pack("<Q", len(data)))
+            f.write(data)
+            for buf in buffers:
+                raw = buf.raw()
+                f.write(struct.pack("<Q", raw.nbytes))
+                f.write(raw)
+        os.replace(tmp, entry)  # readers never see a half-written entry
+        self.evict()
+
+    def load(self, path: str, backend: str = "dict") -> List[SaleRecord]:
+        """Cached records for path, parsing and storing them on a miss."""
+        records = self.get(path)
+        if records is None:
+            records = load_sales_csv(path, backend=backend)
+            self.put(path, records)
+        return records
+
+    def invalidate(self, path: str) -> None:
+        prefix = self._prefix(path) + "-"
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name.endswith(".pkl"):
+                self._remove(name)
+
+    def evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                try:
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue  # removed by a concurrent writer
+                entries.append((st.st_mtime_ns, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(name)
+            total -= size
+
+    def _remove(self, name: str) -> None:
+        # Several loaders may share the directory, so the file can already be gone
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except FileNotFoundError:
+            pass
+
+
+# -----------------------------
+# Concurrent multi-file load
+# -----------------------------
+@dataclass
+class FileLoadResult:
+    path: str
+    records: List[SaleRecord]
+    seconds: float          # time spent inside the loader for this file
+    from_cache: bool = False
+
+
+def _timed_load(path: str, backend: str, cache_dir: str | None = None) -> FileLoadResult:
+    start = time.perf_counter()
+    if cache_dir is None:
+        return FileLoadResult(path, load_sales_csv(path, backend=backend), time.perf_counter() - start)
+    cache = SalesDatasetCache(cache_dir)
+    records = cache.get(path)
+    from_cache = records is not None
+    if not from_cache:
+        records = load_sales_csv(path, backend=backend)
+        cache.put(path, records)
+    return FileLoadResult(path, records, time.perf_counter() - start, from_cache)
+
+
+def load_sales_files_concurrently(
+    paths: List[str],
+    max_concurrency: int = 4,
+    backend: str = "dict",
+    executor: Executor | None = None,
+    cache_dir: str | None = None,
+) -> Dict[str, FileLoadResult]:
+    """
+    Load several CSVs with at most max_concurrency in flight, overlapping file I/O and parsing.
+    Uses a thread pool unless an executor is given (a ProcessPoolExecutor also runs the
+    parsing itself in parallel). With cache_dir, files go through a SalesDatasetCache there,
+    so unchanged CSVs are not re-parsed. Results are returned in the order of `paths`.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    results: Dict[str, FileLoadResult] = {}
+    try:
+        queue = list(paths)
+        in_flight: Dict[Future, str] = {}
+        while queue or in_flight:
+            while queue and len(in_flight) < max_concurrency:
+                path = queue.pop(0)
+                in_flight[executor.submit(_timed_load, path, backend, cache_dir)] = path
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                results[in_flight.pop(fut)] = fut.result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return {path: results[path] for path in paths}
+
+
+# -----------------------------
+# Persistent sale_id index
+# -----------------------------
+# File layout: header (magic, version, source size, source mtime_ns, n)
+# followed by sorted_ids (n * int64) and positions (n * int64).
+INDEX_MAGIC = b"SALESIDX"
+INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<8sIQqQ")
+
+
+class SaleIdIndex:
+    """
+    sale_id -> row position, in two forms:
+    - sorted: sorted_ids/positions arrays, looked up with bisect (O(log N))
+    - hash  : dict built lazily from the sorted arrays (O(1) average)
+    For duplicate ids both forms return the first row in file order.
+    """
+
+    def __init__(self, sorted_ids: array, positions: array):
+        self.sorted_ids = sorted_ids
+        self.positions = positions
+        self._hash: Dict[int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.sorted_ids)
+
+    @classmethod
+    def build(cls, sale_ids) -> "SaleIdIndex":
+        # Stable sort keeps equal ids in file order (O(N log N))
+        order = sorted(range(len(sale_ids)), key=sale_ids.__getitem__)
+        return cls(array("q", [sale_ids[i] for i in order]), array("q", order))
+
+    @property
+    def hash_index(self) -> Dict[int, int]:
+        if self._hash is None:
+            # Fill back to front so the first occurrence of a duplicate wins
+            self._hash = dict(zip(reversed(self.sorted_ids), reversed(self.positions)))
+        return self._hash
+
+    def lookup_sorted(self, target_id: int) -> int | None:
+        i = bisect.bisect_left(self.sorted_ids, target_id)
+        if i < len(self.sorted_ids) and self.sorted_ids[i] == target_id:
+            return self.positions[i]
+        return None
+
+    def lookup_hash(self, target_id: int) -> int | None:
+        return self.hash_index.get(target_id)
+
+    def lookup_many(self, target_ids: Iterable[int], method: str = "hash") -> List[int | None]:
+        if method == "hash":
+            get = self.hash_index.get
+            return [get(t) for t in target_ids]
+        if method == "sorted":
+            return [self.lookup_sorted(t) for t in target_ids]
+        raise ValueError(f"unknown lookup method: {method!r}")
+
+    def save(self, path: str, source_size: int, source_mtime_ns: int) -> None:
+        with open(path, "wb") as f:
+            f.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, source_size, source_mtime_ns, len(self)))
+            f.write(self.sorted_ids.tobytes())
+            f.write(self.positions.tobytes())
+
+    @classmethod
+    def load(cls, path: str, source_size: int, source_mtime_ns: int) -> "SaleIdIndex | None":
+        """Return the saved index, or None if it is missing or was built from a different file version."""
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_INDEX_HEADER.size)
+                if len(header) != _INDEX_HEADER.size:
+                    return None
+                magic, version, size, mtime_ns, n = _INDEX_HEADER.unpack(header)
+                if (magic, version, size, mtime_ns) != (INDEX_MAGIC, INDEX_VERSION, source_size, source_mtime_ns):
+                    return None
+                sorted_ids = array("q")
+                positions = array("q")
+                sorted_ids.fromfile(f, n)
+                positions.fromfile(f, n)
+        except (OSError, EOFError):
+            return None
+        return cls(sorted_ids, positions)
+
+
+def load_or_build_id_index(csv_path: str, sale_ids=None) -> SaleIdIndex:
+    """
+    Reuse <csv>.idx when its recorded size/mtime match csv_path, otherwise build
+    the index (from sale_ids if given, else by reading the CSV) and save it.
+    """
+    st = os.stat(csv_path)
+    idx_path = os.path.splitext(csv_path)[0] + ".idx"
+    index = SaleIdIndex.load(idx_path, st.st_size, st.st_mtime_ns)
+    if index is None:
+        if sale_ids is None:
+            sale_ids = load_sales_table(csv_path).sale_ids
+        index = SaleIdIndex.build(sale_ids)
+        index.save(idx_path, st.st_size, st.st_mtime_ns)
+    return index
+
+
+def search_sale_by_id_indexed(
+    records: List[SaleRecord], index: SaleIdIndex, target_id: int, method: str = "hash"
+) -> SaleRecord | None:
+    pos = index.lookup_hash(target_id) if method == "hash" else index.lookup_sorted(target_id)
+    return None if pos is None else records[pos]
+
+
+def search_sales_by_ids_batch(
+    records: List[SaleRecord], index: SaleIdIndex, target_ids: Iterable[int], method: str = "hash"
+) -> List[SaleRecord | None]:
+    return [None if pos is None else records[pos] for pos in index.lookup_many(target_ids, method)]
+
+
+# -----------------------------
+# Incremental (tail-follow) aggregates
+# -----------------------------
+class IncrementalSalesAggregator:
+    """
+    Follow a sales CSV that is only ever appended to.
+    refresh() parses just the bytes written since the previous call and
+    updates running aggregates, so its cost is O(appended rows).
+    A trailing line without a newline is left for the next refresh.
+    A file that shrank, was replaced (new inode) or rewritten in place (the
+    last consumed bytes changed) is re-read from the start.
+    """
+
+    # Bytes just before the offset kept to detect in-place rewrites
+    TAIL_CHECK = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self._file_id: Tuple[int, int] | None = None  # (st_dev, st_ino)
+        self._tail = b""
+        self.fieldnames: List[str] | None = None
+        self.aggregate = SalesAggregate()
+        self._latest_date = ""
+        # sale_id -> byte offset of its first line; doubles as the seen-id set
+        self.id_index: Dict[int, int] = {}
+
+    def refresh(self) -> int:
+        """Consume newly appended rows. Returns how many rows were added."""
+        with open(self.path, "rb") as f:
+            st = os.fstat(f.fileno())
+            if self.offset and self._changed(f, st):
+                self._reset()  # file was truncated or replaced: start over
+            self._file_id = (st.st_dev, st.st_ino)
+            f.seek(self.offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return 0
+        self._tail = (self._tail + data[:end])[-self.TAIL_CHECK:]
+
+        pos = self.offset
+        lines = data[:end].splitlines(keepends=True)
+        if self.fieldnames is None:
+            self.fieldnames = next(csv.reader([lines[0].decode("utf-8")]))
+            pos += len(lines[0])
+            lines = lines[1:]
+        i_id = self.fieldnames.index("sale_id")
+        i_date = self.fieldnames.index("sale_date")
+        i_amount = self.fieldnames.index("amount")
+        i_product = self.fieldnames.index("product")
+
+        agg = self.aggregate
+        added = 0
+        for line in lines:
+            row = next(csv.reader([line.decode("utf-8")]), None)
+            if row:
+                r = SaleRecord(
+                    sale_id=int(row[i_id]),
+                    sale_date=row[i_date],
+                    amount=float(row[i_amount]),
+                    product=row[i_product],
+                )
+                agg.row_count += 1
+                agg.total_revenue += r.amount
+                if agg.latest_sale is None or r.sale_date > self._latest_date:
+                    agg.latest_sale = r
+                    self._latest_date = r.sale_date
+                if r.sale_id in self.id_index:
+                    agg.has_duplicates = True
+                else:
+                    self.id_index[r.sale_id] = pos
+                added += 1
+            pos += len(line)
+
+        self.offset += end
+        return added
+
+    def _changed(self, f, st: os.stat_result) -> bool:
+        if st.st_size < self.offset or (st.st_dev, st.st_ino) != self._file_id:
+            return True
+        f.seek(self.offset - len(self._tail))
+        return f.read(len(self._tail)) != self._tail
+
+    def lookup(self, sale_id: int) -> SaleRecord | None:
+        """Fetch the first record with sale_id by seeking to its indexed line."""
+        pos = self.id_index.get(sale_id)
+        if pos is None:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(pos)
+            row = next(csv.reader([f.readline().decode("utf-8")]))
+        return SaleRecord(
+            sale_id=int(row[self.fieldnames.index("sale_id")]),
+            sale_date=row[self.fieldnames.index("sale_date")],
+            amount=float(row[self.fieldnames.index("amount")]),
+            product=row[self.fieldnames.index("product")],
+        )
+
+
+# -----------------------------
+# Group-by aggregation
+# -----------------------------
+@dataclass
+class GroupStats:
+    count: int = 0
+    revenue: float = 0.0
+    min_amount: float = math.inf
+    max_amount: float = -math.inf
+
+
+# Group key per record; every key is a string so both engines return the same dicts
+GROUP_KEYS: Dict[str, Callable[[SaleRecord], str]] = {
+    "product": lambda r: r.product,
+    "day": lambda r: r.sale_date,
+    "month": lambda r: r.sale_date[:7],   # "YYYY-MM"
+}
+
+
+def group_sales(records: List[SaleRecord], by: str) -> Dict[str, GroupStats]:
+    """Hash aggregation on the record list: one pass, one dict entry per group (O(N))."""
+    key = GROUP_KEYS[by]
+    groups: Dict[str, GroupStats] = {}
+    for r in records:
+        k = key(r)
+        g = groups.get(k)
+        if g is None:
+            g = groups[k] = GroupStats()
+        g.count += 1
+        g.revenue += r.amount
+        if r.amount < g.min_amount:
+            g.min_amount = r.amount
+        if r.amount > g.max_amount:
+            g.max_amount = r.amount
+    return groups
+
+
+def _table_group_codes(table: SalesTable, by: str) -> Tuple[object, Callable[[int], str]]:
+    # Integer group code per row, plus code -> label
+    if by == "product":
+        return table.product_codes, table.product_name
+    if by == "day":
+        return table.date_ordinals, lambda o: date.fromordinal(o).isoformat()
+    if by == "month":
+        months = {}
+        for o in set(table.date_ordinals):
+            d = date.fromordinal(o)
+            months[o] = d.year * 12 + d.month - 1
+        return list(map(months.__getitem__, table.date_ordinals)), lambda m: f"{m // 12:04d}-{m % 12 + 1:02d}"
+    raise ValueError(f"unknown group key: {by!r} (choose from {sorted(GROUP_KEYS)})")
+
+
+def group_sales_table(table: SalesTable, by: str) -> Dict[str, GroupStats]:
+    """
+    Columnar aggregation without hashing: group codes are dense small ints (product code,
+    day ordinal, month index), so one O(N) pass over the code and amount columns updates
+    per-code accumulator lists (offset by the smallest code), then O(G) to build the result.
+    Amounts are added in file order, so revenues match group_sales exactly.
+    """
+    codes, label = _table_group_codes(table, by)
+    if len(codes) == 0:
+        return {}
+    if not isinstance(codes, list):
+        codes = codes.tolist()  # iterating lists is cheaper than boxing array items
+    base = min(codes)
+    size = max(codes) - base + 1
+    counts = [0] * size
+    revenue = [0.0] * size
+    lows = [math.inf] * size
+    highs = [-math.inf] * size
+    for c, a in zip(codes, table.amounts.tolist()):
+        k = c - base
+        counts[k] += 1
+        revenue[k] += a
+        if a < lows[k]:
+            lows[k] = a
+        if a > highs[k]:
+            highs[k] = a
+    return {
+        label(k + base): GroupStats(counts[k], revenue[k], lows[k], highs[k])
+        for k in range(size)
+        if counts[k]
+    }
+
+
+# -----------------------------
+# Date-range queries (sorted date index + prefix sums)
+# -----------------------------
+class SalesDateIndex:
+    """
+    Built once after load (O(N log N)); every query below is O(log N).
+    - ordinals       : sale dates as day ordinals, sorted ascending
+    - order          : row position of each sorted entry (stable, so ties stay in file order)
+    - revenue_prefix : revenue_prefix[i] = sum of the first i sorted amounts
+    - days/day_start : distinct days and where each one starts in `ordinals`
+    Dates are accepted and returned as ISO "YYYY-MM-DD" strings; ranges are inclusive.
+    """
+
+    def __init__(self, records: List[SaleRecord]):
+        self.records = records
+        keys = [date.fromisoformat(r.sale_date).toordinal() for r in records]
+        order = sorted(range(len(records)), key=keys.__getitem__)
+        self.order = array("q", order)
+        self.ordinals = array("i", [keys[i] for i in order])
+        self.revenue_prefix = array("d", accumulate((records[i].amount for i in order), initial=0.0))
+
+        self.days = array("i")
+        self.day_start = array("q")
+        prev = None
+        for i, d in enumerate(self.ordinals):
+            if d != prev:
+                self.days.append(d)
+                self.day_start.append(i)
+                prev = d
+        self.day_start.append(len(self.ordinals))
+
+    def _span(self, start: str, end: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self.ordinals, date.fromisoformat(start).toordinal())
+        hi = bisect.bisect_right(self.ordinals, date.fromisoformat(end).toordinal())
+        return lo, max(lo, hi)
+
+    def revenue_between(self, start: str, end: str) -> float:
+        lo, hi = self._span(start, end)
+        return self.revenue_prefix[hi] - self.revenue_prefix[lo]
+
+    def count_between(self, start: str, end: str) -> int:
+        lo, hi = self._span(start, end)
+        return hi - lo
+
+    def sales_count_on(self, day: str) -> int:
+        return self.count_between(day, day)
+
+    def sales_count_per_day(self, start: str, end: str) -> Dict[str, int]:
+        # O(log N + number of distinct days in the range)
+        lo = bisect.bisect_left(self.days, date.fromisoformat(start).toordinal())
+        hi = bisect.bisect_right(self.days, date.fromisoformat(end).toordinal())
+        return {
+            date.fromordinal(self.days[k]).isoformat(): self.day_start[k + 1] - self.day_start[k]
+            for k in range(lo, hi)
+        }
+
+    def latest_sale_before(self, day: str) -> SaleRecord | None:
+        """Latest sale strictly before `day`; ties resolve to the first row, like get_latest_sale."""
+        i = bisect.bisect_left(self.ordinals, date.fromisoformat(day).toordinal())
+        if i == 0:
+            return None
+        first = bisect.bisect_left(self.ordinals, self.ordinals[i - 1])
+        return self.records[self.order[first]]
+
+
+def revenue_between_scan(records: List[SaleRecord], start: str, end: str) -> float:
+    # Baseline without an index (O(N)); ISO strings compare like dates
+    return sum(r.amount for r in records if start <= r.sale_date <= end)
+
+
+# -----------------------------
+# Benchmark helpers
+# -----------------------------
+@dataclass
+class TimingResult:
+    """Per-call times (ms) for one benchmark plus summary statistics."""
+    samples_ms: List[float]
+    loops: int = 1  # calls per sample; samples_ms are already divided by this
+    median_ms: float = field(init=False)
+    q1_ms: float = field(init=False)
+    q3_ms: float = field(init=False)
+    ci_low_ms: float = field(init=False)
+    ci_high_ms: float = field(init=False)
+
+    def __post_init__(self):
+        xs = sorted(self.samples_ms)
+        self.median_ms = statistics.median(xs)
+        if len(xs) >= 2:
+            self.q1_ms, _, self.q3_ms = statistics.quantiles(xs, n=4, method="inclusive")
+        else:
+            self.q1_ms = self.q3_ms = xs[0]
+        self.ci_low_ms, self.ci_high_ms = median_confidence_interval(xs)
+
+    @property
+    def iqr_ms(self) -> float:
+        return self.q3_ms - self.q1_ms
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "median_ms": self.median_ms,
+            "q1_ms": self.q1_ms,
+            "q3_ms": self.q3_ms,
+            "iqr_ms": self.iqr_ms,
+            "ci95_ms": [self.ci_low_ms, self.ci_high_ms],
+            "runs": len(self.samples_ms),
+            "loops": self.loops,
+            "samples_ms": self.samples_ms,
+        }
+
+
+def median_confidence_interval(sorted_xs: List[float], confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Distribution-free CI for the median from order statistics
+    (normal approximation to the binomial). Falls back to (min, max) for tiny samples.
+    """
+    n = len(sorted_xs)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    half = z * math.sqrt(n) / 2
+    lo = math.floor(n / 2 - half)
+    hi = math.ceil(n / 2 + half)
+    if lo < 0 or hi > n - 1:
+        return sorted_xs[0], sorted_xs[-1]
+    return sorted_xs[lo], sorted_xs[hi]
+
+
+def measure(
+    fn: Callable[[], object],
+    runs: int = 5,
+    warmup: int = 1,
+    max_runs: int = 50,
+    target_time_s: float = 0.05,
+    min_sample_s: float = 1e-4,
+    loops: int | None = None,
+    disable_gc: bool = True,
+) -> TimingResult:
+    """
+    Time fn with warmup and an adaptive number of samples.
+    - warmup calls are not recorded; the last one estimates the per-call cost
+    - loops: calls per sample, chosen so each sample lasts >= min_sample_s
+    - runs : minimum sample count, raised toward target_time_s (capped at max_runs)
+    GC is collected first and disabled while timing so collections do not land in samples.
+    Pass warmup=0, runs=max_runs=1, loops=1 for operations that can only run once.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    if disable_gc:
+        gc.disable()
+    try:
+        est = None
+        for _ in range(warmup):
+            start = time.perf_counter()
+            fn()
+            est = time.perf_counter() - start
+
+        if loops is None:
+            loops = 1 if not est else max(1, math.ceil(min_sample_s / est))
+        if est:
+            runs = min(max_runs, max(runs, math.ceil(target_time_s / (est * loops))))
+
+        samples: List[float] = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - start) * 1000.0 / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return TimingResult(samples, loops)
+
+
+@dataclass
+class MemoryResult:
+    peak_bytes: int      # highest traced allocation during the call
+    retained_bytes: int  # still allocated after the call while its result is alive
+    n: int               # rows in the dataset, for bytes_per_row
+
+    @property
+    def bytes_per_row(self) -> float:
+        return self.retained_bytes / self.n if self.n else float("nan")
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "peak_bytes": self.peak_bytes,
+            "retained_bytes": self.retained_bytes,
+            "bytes_per_row": self.bytes_per_row,
+        }
+
+
+def measure_memory(fn: Callable[[], object], n: int = 0) -> MemoryResult:
+    """
+    Run fn once under tracemalloc. Peak and retained sizes are relative to the
+    traced memory just before the call; the return value is kept alive until
+    retained is read, so for loaders it is the size of the loaded dataset.
+    """
+    gc.collect()
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return MemoryResult(peak - before, max(0, current - before), n)
+
+
+# Default significance level for baseline comparisons
+BASELINE_ALPHA = 0.01
+
+
+@lru_cache(maxsize=None)
+def _u_count(n1: int, n2: int, u: int) -> int:
+    # Orderings of n1 xs and n2 ys with exactly u (x, y) pairs where y > x.
+    # The largest value is either a y (beats all n1 xs) or an x (beats nothing).
+    if u < 0:
+        return 0
+    if n1 == 0 or n2 == 0:
+        return 1 if u == 0 else 0
+    return _u_count(n1, n2 - 1, u - n1) + _u_count(n1 - 1, n2, u)
+
+
+def mann_whitney_min_p(n1: int, n2: int) -> float:
+    """Smallest one-sided p-value attainable with n1 vs n2 samples (fully separated)."""
+    return 1.0 / math.comb(n1 + n2, n1) if n1 and n2 else 1.0
+
+
+def mann_whitney_min_samples(alpha: float = BASELINE_ALPHA) -> int:
+    """Samples needed per side before a Mann-Whitney test can reach p < alpha (5 for 0.01)."""
+    k = 1
+    while mann_whitney_min_p(k, k) >= alpha:
+        k += 1
+    return k
+
+
+def mann_whitney_p(xs: List[float], ys: List[float]) -> float:
+    """
+    One-sided Mann-Whitney U test: p-value for "ys tend to be larger than xs".
+    Exact U distribution for small samples without ties, otherwise the normal
+    approximation with tie-corrected ranks.
+    """
+    n1, n2 = len(xs), len(ys)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    combined = sorted([(v, 0) for v in xs] + [(v, 1) for v in ys])
+    ranks = [0.0] * len(combined)
+    i = 0
+    tie_term = 0.0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = avg_rank
+        t = j - i + 1
+        tie_term += t ** 3 - t
+        i = j + 1
+    r2 = sum(r for r, (_, g) in zip(ranks, combined) if g == 1)
+    u2 = r2 - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    if tie_term == 0 and n <= 60:
+        u = round(u2)
+        return sum(_u_count(n1, n2, k) for k in range(u, n1 * n2 + 1)) / math.comb(n, n1)
+    var = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (u2 - n1 * n2 / 2) / math.sqrt(var)
+    return 1.0 - statistics.NormalDist().cdf(z)
+
+
+def environment_info() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def environment_fingerprint(env: Dict[str, object]) -> str:
+    """Short stable id of the machine/interpreter; history is only compared within one fingerprint."""
+    keys = ("python", "implementation", "platform", "machine", "cpu_count")
+    return hashlib.sha1(json.dumps([env.get(k) for k in keys]).encode("utf-8")).hexdigest()[:12]
+
+
+def git_revision() -> str | None:
+    """`git describe --always --dirty` of this script's checkout, or None outside git."""
+    try:
+        proc = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.strip() or None
+
+
+def results_to_json(
+    Ns: List[int],
+    results: Dict[str, List[TimingResult]],
+    memory: Dict[str, List[MemoryResult]] | None = None,
+) -> Dict[str, object]:
+    memory = memory or {}
+    return {
+        "meta": {
+            **environment_info(),
+            "git_revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": [
+            {
+                "operation": op,
+                "n": n,
+                **r.to_dict(),
+                **(memory[op][i].to_dict() if op in memory and i < len(memory[op]) else {}),
+            }
+            for op, rs in results.items()
+            for i, (n, r) in enumerate(zip(Ns, rs))
+        ],
+    }
+
+
+def compare_to_baseline(
+    current: Dict[str, object],
+    baseline: Dict[str, object],
+    threshold: float = 0.05,
+    alpha: float = BASELINE_ALPHA,
+) -> List[Dict[str, object]]:
+    """
+    Compare two results_to_json() documents. An (operation, n) pair is flagged when
+    its median grew by more than `threshold` and either the Mann-Whitney test gives
+    p < alpha ("regression"), or there are too few samples for any p < alpha to be
+    possible ("insufficient samples"); a slowdown is never passed silently.
+    """
+    base = {(r["operation"], r["n"]): r for r in baseline["results"]}
+    flagged = []
+    for r in current["results"]:
+        b = base.get((r["operation"], r["n"]))
+        if b is None or b["median_ms"] <= 0:
+            continue
+        ratio = r["median_ms"] / b["median_ms"]
+        if ratio <= 1 + threshold:
+            continue
+        p = mann_whitney_p(b["samples_ms"], r["samples_ms"])
+        if p < alpha:
+            status = "regression"
+        elif mann_whitney_min_p(len(b["samples_ms"]), len(r["samples_ms"])) >= alpha:
+            status = "insufficient samples"
+        else:
+            continue
+        flagged.append({
+            "operation": r["operation"],
+            "n": r["n"],
+            "baseline_ms": b["median_ms"],
+            "current_ms": r["median_ms"],
+            "ratio": ratio,
+            "p_value": p,
+            "status": status,
+        })
+    return flagged
+
+def regression_slope_loglog(ns: List[int], ts_ms: List[float]) -> float:
+    """
+    Estimate slope in log-log space (time ~ N^slope).
+    - slope ~ 1 : O(N)
+    - slope ~ 0 : O(1) (or dominated by constants)
+    - slope ~ 2 : O(N^2)
+    """
+    xs = [math.log(n) for n in ns]
+    ys = [math.log(max(t, 1e-12)) for t in ts_ms]  # avoid log(0)
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    num = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    den = sum((x - x_mean) ** 2 for x in xs)
+    return num / den if den != 0 else float("nan")
+
+
+# -----------------------------
+# Complexity fitting
+# -----------------------------
+# Each model is t(N) = a + b * g(N); a is the fixed per-call overhead.
+COMPLEXITY_MODELS: Dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 0.0,
+    "O(log N)": lambda n: math.log(n),
+    "O(N)": lambda n: n,
+    "O(N log N)": lambda n: n * math.log(n),
+    "O(N^2)": lambda n: n * n,
+}
+
+
+@dataclass
+class ComplexityFit:
+    model: str
+    a: float         # constant term (ms)
+    b: float         # coefficient of g(N) (ms per unit of g)
+    rel_rmse: float  # root mean squared relative error of the fit
+
+    def predict(self, n: int) -> float:
+        return self.a + self.b * COMPLEXITY_MODELS[self.model](n)
+
+
+@dataclass
+class ComplexityReport:
+    fits: List[ComplexityFit]       # lowest relative error first
+    candidates: List[str]           # models the data cannot tell apart (see fit_complexity)
+
+    @property
+    def best(self) -> ComplexityFit:
+        return self.fits[0]
+
+    @property
+    def ambiguous(self) -> bool:
+        return len(self.candidates) > 1
+
+    @property
+    def selected(self) -> str | None:
+        return None if self.ambiguous else self.candidates[0]
+
+    def resolvable_at(self, n: int, min_ratio: float = 3.0) -> bool:
+        """
+        Whether measuring at n can separate the candidates: their predictions at n must
+        differ by more than min_ratio times the relative noise of the best fit.
+        """
+        preds = [f.predict(n) for f in self.fits if f.model in self.candidates]
+        lo, hi = min(preds), max(preds)
+        return lo > 0 and (hi / lo - 1) > min_ratio * max(self.best.rel_rmse, 0.01)
+
+
+def fit_model(ns: List[int], ts_ms: List[float], model: str) -> ComplexityFit:
+    """
+    Weighted least squares with weights 1/t^2, i.e. minimise relative error so the
+    largest N does not dominate. Coefficients are constrained to a >= 0, b >= 0.
+    """
+    g = COMPLEXITY_MODELS[model]
+    ts = [max(t, 1e-12) for t in ts_ms]
+    ws = [1.0 / (t * t) for t in ts]
+    scale = max(g(n) for n in ns) or 1.0  # keep the normal equations well conditioned
+    gs = [g(n) / scale for n in ns]
+
+    s_w = sum(ws)
+    s_t = sum(w * t for w, t in zip(ws, ts))
+    a, b = s_t / s_w, 0.0
+    if model != "O(1)":
+        s_g = sum(w * x for w, x in zip(ws, gs))
+        s_gg = sum(w * x * x for w, x in zip(ws, gs))
+        s_gt = sum(w * x * t for w, x, t in zip(ws, gs, ts))
+        det = s_w * s_gg - s_g * s_g
+        if det > 0:
+            b = (s_w * s_gt - s_g * s_t) / det
+            a = (s_t - b * s_g) / s_w
+        if b < 0:
+            a, b = s_t / s_w, 0.0     # no growth at all: same as O(1)
+        elif a < 0 and s_gg > 0:
+            a, b = 0.0, s_gt / s_gg   # pure b * g(N)
+
+    preds = [a + b * x for x in gs]
+    rel_rmse = math.sqrt(sum(((t - f) / t) ** 2 for t, f in zip(ts, preds)) / len(ts))
+    return ComplexityFit(model, a, b / scale, rel_rmse)
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta I_x(a, b) (continued fraction, Numerical Recipes betacf)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _betainc(b, a, 1.0 - x)
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 200):
+        for num in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + num * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + num / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+    return math.exp(log_front) * h / a
+
+
+def growth_p_value(ns: List[int], ts_ms: List[float], fit: ComplexityFit, const: ComplexityFit) -> float:
+    """
+    Nested-model F-test of a + b*g(N) against the constant model (F(1, k-2) on the
+    relative residuals): p-value for "the growth term explains nothing beyond noise".
+    A model with b == 0 is the constant model, so p = 1.
+    """
+    k = len(ns)
+    if fit.b <= 0:
+        return 1.0
+    rss0 = k * const.rel_rmse ** 2
+    rss1 = k * fit.rel_rmse ** 2
+    if k <= 2:
+        return 0.0 if rss0 > 0 else 1.0  # no residual degrees of freedom: cannot test
+    if rss1 <= 0:
+        return 0.0 if rss0 > 0 else 1.0
+    df = k - 2
+    f_stat = max(0.0, rss0 - rss1) / (rss1 / df)
+    return _betainc(df / 2, 0.5, df / (df + f_stat))
+
+
+def fit_complexity(
+    ns: List[int],
+    ts_ms: List[float],
+    noise: List[float] | None = None,
+    model_alpha: float = 0.05,
+    abs_tolerance: float = 0.02,
+    growth_alpha: float = 0.05,
+    growth_share: float = 0.5,
+) -> ComplexityReport:
+    """
+    Fit every model in COMPLEXITY_MODELS and rank them by relative RMSE (report.best is
+    the lowest error; report.selected is the chosen model, None when ambiguous).
+    - With <= 2 sizes there are no residual degrees of freedom: every model is a candidate.
+    - A model is a candidate unless its residuals are significantly larger than the
+      lowest-error model's: variance-ratio F-test with (k-2, k-2) degrees of freedom at
+      model_alpha (with 4 sizes that needs about 4.4x the error), or within
+      lowest + max(abs_tolerance, RMS noise), where noise is the per-point relative spread
+      of the timings (e.g. IQR / median). So O(N) vs O(N log N) is only settled when the
+      gap is larger than both the fit residuals and the measured noise.
+    - Every model except O(1) has a free b >= 0, so it always fits constant data at least
+      as well; a growth model only counts when its growth term is real: significant
+      against O(1) (growth_p_value < growth_alpha), or at least growth_share of the fitted
+      time at the largest N across the measured sizes while O(1) is worse by more than the
+      noise margin (the F-test has little power with 3-4 sizes). Then O(1) is rejected and the candidates are the counted models within
+      tolerance.
+    - If no growth is real and O(1)'s error is within the noise margin of the lowest, the
+      answer is O(1). If a growth model still fits clearly better, the result stays
+      ambiguous between O(1) and the models within tolerance rather than asserting either.
+    """
+    fits = sorted((fit_model(ns, ts_ms, m) for m in COMPLEXITY_MODELS), key=lambda f: f.rel_rmse)
+    if len(ns) <= 2:
+        return ComplexityReport(fits, [f.model for f in fits])
+
+    const = next(f for f in fits if f.model == "O(1)")
+    n_min, n_max = min(ns), max(ns)
+    spread = math.sqrt(sum(x * x for x in noise) / len(noise)) if noise else 0.0
+    margin = max(abs_tolerance, spread)
+    df = len(ns) - 2
+
+    def within(pool: List[ComplexityFit]) -> List[str]:
+        lowest = pool[0].rel_rmse
+        kept = []
+        for f in pool:
+            if f.rel_rmse <= lowest + margin:
+                kept.append(f.model)
+                continue
+            ratio = (f.rel_rmse / lowest) ** 2 if lowest > 0 else math.inf
+            if _betainc(df / 2, df / 2, 1.0 / (1.0 + ratio)) >= model_alpha:
+                kept.append(f.model)  # not significantly worse than the lowest error
+        return kept
+
+    def real_growth(f: ComplexityFit) -> bool:
+        if f.b <= 0:
+            return False
+        g = COMPLEXITY_MODELS[f.model]
+        # Fitted growth across the measured sizes, as a share of the time at the largest N
+        share = f.b * (g(n_max) - g(n_min)) / f.predict(n_max)
+        if share >= growth_share and const.rel_rmse > f.rel_rmse + margin:
+            return True
+        return growth_p_value(ns, ts_ms, f, const) < growth_alpha
+
+    growing = [f for f in fits if f.model != "O(1)" and real_growth(f)]
+    if growing:
+        return ComplexityReport(fits, within(growing))
+    if const.rel_rmse <= fits[0].rel_rmse + margin:
+        return ComplexityReport(fits, [const.model])  # constant explains the data within noise
+    candidates = within(fits)
+    return ComplexityReport(fits, [const.model] + [m for m in candidates if m != const.model])
+
+
+def base_complexity(label: str) -> str:
+    """'O(N) avg' -> 'O(N)', 'O(log N) per ID' -> 'O(log N)', 'O(N log K)' -> 'O(N)'."""
+    m = re.search(r"O\([^)]*\)", label)
+    if not m:
+        return label
+    # K (top-K size) is the same for every dataset, so its factor does not grow with N
+    return m.group(0).replace(" log K", "")
+
+
+def suggest_extra_sizes(ns: List[int], max_n: int) -> List[int]:
+    """Continue the geometric progression of ns (e.g. x10) up to max_n."""
+    ratio = ns[-1] / ns[-2] if len(ns) >= 2 and ns[-2] > 0 else 10
+    ratio = max(ratio, 2)
+    sizes = []
+    n = ns[-1]
+    while True:
+        n = int(n * ratio)
+        if n > max_n:
+            return sizes
+        sizes.append(n)
+
+def markdown_table(headers: List[str], rows: List[List[str]]) -> str:
+    line1 = "| " + " | ".join(headers) + " |"
+    line2 = "| " + " | ".join(["---"] * len(headers)) + " |"
+    lines = [line1, line2]
+    for r in rows:
+        lines.append("| " + " | ".join(r) + " |")
+    return "\n".join(lines)
+
+
+# -----------------------------
+# Profiling
+# -----------------------------
+class StackSampler:
+    """
+    Sampling profiler thread: every `interval` seconds it records the Python stack of
+    one target thread. collapsed() returns "root;...;leaf count" lines, the input
+    format of flamegraph.pl / speedscope / inferno. Sampling happens when the sampler
+    gets the GIL, so the switch interval is lowered to `interval` while it runs.
+    """
+
+    def __init__(self, interval: float = 0.001, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.counts: Counter = Counter()
+        self.paused = False  # set while the target runs code that should not be profiled
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="StackSampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self.paused:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.interval)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+def profile_slug(op_name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", op_name.lower()).strip("-")
+
+
+def profile_paths(prefix: str, op_name: str, n: int) -> Tuple[str, str]:
+    """<prefix>.<operation-slug>.n<N>.prof (cProfile) and .collapsed (sampled stacks)."""
+    base = f"{prefix}.{profile_slug(op_name)}.n{n}"
+    return base + ".prof", base + ".collapsed"
+
+
+def capture_profiles(
+    make_fn: Callable[[], Callable[[], object]],
+    prof_path: str,
+    collapsed_path: str,
+    min_sample_s: float = 0.2,
+    max_calls: int = 1000,
+) -> None:
+    """
+    cProfile one call into prof_path, then call repeatedly under StackSampler
+    (until min_sample_s of sampled time or max_calls) and write collapsed stacks.
+    make_fn is called for every call, so one-shot operations get a fresh setup; it runs
+    outside both profilers, so only the operation itself is profiled.
+    """
+    fn = make_fn()
+    profiler = cProfile.Profile()
+    profiler.runcall(fn)
+    profiler.dump_stats(prof_path)
+
+    calls = 0
+    sampled_s = 0.0
+    with StackSampler() as sampler:
+        while calls < max_calls and (calls == 0 or sampled_s < min_sample_s):
+            sampler.paused = True
+            fn = make_fn()
+            sampler.paused = False
+            start = time.perf_counter()
+            fn()
+            sampled_s += time.perf_counter() - start
+            calls += 1
+        sampler.paused = True
+    with open(collapsed_path, "w", encoding="utf-8") as f:
+        f.write(sampler.collapsed())
+
+
+# -----------------------------
+# Benchmark history (SQLite)
+# -----------------------------
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp   TEXT NOT NULL,
+    git_rev     TEXT,
+    fingerprint TEXT NOT NULL,
+    env_json    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id         INTEGER NOT NULL REFERENCES runs(id),
+    operation      TEXT NOT NULL,
+    n              INTEGER NOT NULL,
+    median_ms      REAL NOT NULL,
+    q1_ms          REAL,
+    q3_ms          REAL,
+    samples        INTEGER,
+    loops          INTEGER,
+    peak_bytes     INTEGER,
+    retained_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS results_series ON results(operation, n, run_id);
+"""
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def record_history(db_path: str, doc: Dict[str, object]) -> int:
+    """Append one results_to_json() document to the history database; returns the run id."""
+    meta = doc["meta"]
+    env = {k: v for k, v in meta.items() if k not in ("timestamp", "git_revision")}
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(HISTORY_SCHEMA)
+        cur = conn.execute(
+            "INSERT INTO runs (timestamp, git_rev, fingerprint, env_json) VALUES (?, ?, ?, ?)",
+            (meta["timestamp"], meta.get("git_revision"), environment_fingerprint(env), json.dumps(env)),
+        )
+        run_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (run_id, r["operation"], r["n"], r["median_ms"], r.get("q1_ms"), r.get("q3_ms"),
+                 r.get("runs"), r.get("loops"), r.get("peak_bytes"), r.get("retained_bytes"))
+                for r in doc["results"]
+            ],
+        )
+    return run_id
+
+
+def sparkline(values: List[float]) -> str:
+    lo, hi = min(values), max(values)
+    if hi <= lo:
+        return SPARK_CHARS[0] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (hi - lo)
+    return "".join(SPARK_CHARS[round((v - lo) * scale)] for v in values)
+
+
+def history_report(
+    db_path: str,
+    threshold: float = 0.10,
+    window: int = 5,
+    last: int = 20,
+    fingerprint: str | None = None,
+) -> Tuple[str, List[Tuple[str, int]]]:
+    """
+    Trend table over the history database, one row per (fingerprint, operation, N).
+    Time per row (median_ms / N) of the latest run is compared with the rolling median
+    of the `window` runs before it and flagged when it is more than `threshold` slower.
+    Returns (markdown table, [(operation, n), ...] that regressed).
+    """
+    query = """
+        SELECT runs.fingerprint, results.operation, results.n, results.median_ms, runs.git_rev
+        FROM results JOIN runs ON runs.id = results.run_id
+        {where}
+        ORDER BY runs.fingerprint, results.operation, results.n, runs.id
+    """.format(where="WHERE runs.fingerprint = ?" if fingerprint else "")
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(query, (fingerprint,) if fingerprint else ()).fetchall()
+
+    series: Dict[Tuple[str, str, int], List[Tuple[float, str | None]]] = {}
+    for fp, op, n, median_ms, rev in rows:
+        series.setdefault((fp, op, n), []).append((median_ms / max(n, 1), rev))
+
+    table_rows = []
+    regressions = []
+    for (fp, op, n), points in series.items():
+        per_row = [p for p, _ in points]
+        latest, rev = points[-1]
+        previous = per_row[-1 - window:-1]
+        if previous:
+            ref = statistics.median(previous)
+            change = latest / ref - 1 if ref > 0 else 0.0
+            flag = "REGRESSION" if change > threshold else ""
+            change_txt = f"{change:+.1%}"
+            ref_txt = f"{ref * 1e6:.2f}"
+        else:
+            flag, change_txt, ref_txt = "", "-", "-"
+        if flag:
+            regressions.append((op, n))
+        table_rows.append([
+            fp, op, f"{n:,}", str(len(points)), sparkline(per_row[-last:]),
+            f"{latest * 1e6:.2f}", ref_txt, change_txt, rev or "-", flag,
+        ])
+
+    headers = [
+        "Env", "Operation", "N", "Runs", f"Trend (last {last})",
+        "Latest (ns/row)", f"Median prev {window} (ns/row)", "Change", "Git rev", "Flag",
+    ]
+    return markdown_table(headers, table_rows), regressions
+
+
+# -----------------------------
+# Benchmark operations
+# -----------------------------
+class BenchContext:
+    """Per-dataset state shared by the operations; each piece is built on first use."""
+
+    def __init__(
+        self,
+        path: str,
+        n: int,
+        tmp_dir: str,
+        pool: Executor | None = None,
+        workers: int = 1,
+        records: List[SaleRecord] | None = None,
+        cache_dir: str | None = None,
+    ):
+        if records is not None:
+            self.records = records  # already loaded (fills the cached_property)
+        self.path = path
+        self.n = n
+        self.tmp_dir = tmp_dir
+        self.cache_dir = cache_dir  # persistent parsed-dataset cache; None = per-run temp dir
+        self.pool = pool
+        self.workers = workers
+        # Choose an ID to search: existing (best to test typical successful search)
+        # Since your IDs are unique and generated 0..n-1 (duplicate_rate=0),
+        # pick one near the end to approximate worst-case for linear search.
+        self.target_id = n - 1
+        self.batch_ids = [(i * 7919) % n for i in range(1000)]
+
+    @cached_property
+    def records(self) -> List[SaleRecord]:
+        if self.cache_dir is not None:
+            return self.cache.load(self.path)
+        return load_sales_csv(self.path)
+
+    @cached_property
+    def cache(self) -> SalesDatasetCache:
+        return SalesDatasetCache(self.cache_dir or os.path.join(self.tmp_dir, "cache"))
+
+    @cached_property
+    def compact_records(self) -> List[CompactSaleRecord]:
+        return load_sales_csv(self.path, compact=True)
+
+    @cached_property
+    def table(self) -> SalesTable:
+        return load_sales_table(self.path)
+
+    @cached_property
+    def bin_path(self) -> str:
+        # Binary file is converted once; opening it is just mmap + header read
+        return ensure_sales_binary(self.path)
+
+    def compressed_path(self, suffix: str) -> str:
+        """Compressed copy of the dataset in tmp_dir (made once per suffix)."""
+        out = os.path.join(self.tmp_dir, plain_basename(self.path) + suffix)
+        if not os.path.exists(out):
+            # The source may itself be compressed: recompress the decoded CSV
+            with open_sales_file(self.path, binary=True) as src, COMPRESSED_OPENERS[suffix](out, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+        return out
+
+    @cached_property
+    def ids(self) -> array:
+        return array("q", (r.sale_id for r in self.records))
+
+    @cached_property
+    def index(self) -> SaleIdIndex:
+        index = load_or_build_id_index(self.path, self.ids)
+        index.hash_index  # build the dict outside the timed region
+        return index
+
+    @cached_property
+    def date_index(self) -> SalesDateIndex:
+        return SalesDateIndex(self.records)
+
+
+@dataclass
+class BenchOperation:
+    name: str
+    expected: str
+    # Returns the zero-argument callable to time; all preparation happens here
+    setup: Callable[[BenchContext], Callable[[], object]]
+    runs: int = 5
+    # The callable only does its work once (setup is called again for each measurement)
+    one_shot: bool = False
+    # Parses the whole dataset: also reported in the rows/second table
+    throughput: bool = False
+
+
+def _load_id_index_setup(ctx: BenchContext) -> Callable[[], object]:
+    ctx.index  # make sure <csv>.idx exists
+    st = os.stat(ctx.path)
+    idx_path = os.path.splitext(ctx.path)[0] + ".idx"
+    return partial(SaleIdIndex.load, idx_path, st.st_size, st.st_mtime_ns)
+
+
+def _incremental_refresh_setup(ctx: BenchContext) -> Callable[[], object]:
+    # Prime on all but the last 50 lines, then append them; the returned
+    # refresh consumes exactly those 50 rows. The follower tails a plain
+    # file, so compressed datasets are written out decompressed.
+    with open_sales_file(ctx.path, binary=True) as f:
+        lines = f.readlines()
+    grow_path = os.path.join(ctx.tmp_dir, plain_basename(ctx.path))
+    with open(grow_path, "wb") as f:
+        f.writelines(lines[:-50])
+    follower = IncrementalSalesAggregator(grow_path)
+    follower.refresh()
+    with open(grow_path, "ab") as f:
+        f.writelines(lines[-50:])
+    return follower.refresh
+
+
+def benchmark_operations(workers: int = 1) -> List[BenchOperation]:
+    ops = [
+        # Load time includes IO + parse
+        BenchOperation("Load (CSV -> list)", "O(N)", lambda c: partial(load_sales_csv, c.path), runs=3,
+                       throughput=True),
+        BenchOperation("Retrieve latest sale", "O(N)", lambda c: partial(get_latest_sale, c.records)),
+        BenchOperation("Compute total revenue", "O(N)", lambda c: partial(compute_total_revenue, c.records)),
+        BenchOperation("Check duplicate sale IDs", "O(N) avg", lambda c: partial(has_duplicate_sale_ids, c.records)),
+        BenchOperation("Search sale by ID (linear)", "O(N)",
+                       lambda c: partial(search_sale_by_id_linear, c.records, c.target_id)),
+
+        # Parsed-dataset cache: miss (parse + store) vs hit (no parsing)
+        BenchOperation("Load (cache cold: parse + store)", "O(N)",
+                       lambda c: lambda: (c.cache.invalidate(c.path), c.cache.load(c.path)), runs=3,
+                       throughput=True),
+        BenchOperation("Load (cache warm)", "O(N)",
+                       lambda c: (c.cache.load(c.path), partial(c.cache.load, c.path))[1], runs=3,
+                       throughput=True),
+
+        # Same load with the faster parser backends
+        BenchOperation("Load (CSV -> list, csv.reader)", "O(N)",
+                       lambda c: partial(load_sales_csv, c.path, backend="reader"), runs=3, throughput=True),
+        BenchOperation("Load (CSV -> list, bytes split)", "O(N)",
+                       lambda c: partial(load_sales_csv, c.path, backend="split"), runs=3, throughput=True),
+        BenchOperation("Load (CSV -> list, bulk columns)", "O(N)",
+                       lambda c: partial(load_sales_csv, c.path, backend="bulk"), runs=3, throughput=True),
+
+        # Compressed input: decompression alone, then decompression + parse
+        *(
+            op
+            for suffix, label in ((".gz", "gzip"), (".bz2", "bz2"), (".xz", "xz"))
+            for op in (
+                BenchOperation(f"Decompress only ({label})", "O(N)",
+                               lambda c, s=suffix: partial(read_decompressed, c.compressed_path(s)),
+                               runs=3, throughput=True),
+                BenchOperation(f"Load (CSV.{suffix[1:]} -> list, bytes split)", "O(N)",
+                               lambda c, s=suffix: partial(load_sales_csv, c.compressed_path(s), backend="split"),
+                               runs=3, throughput=True),
+            )
+        ),
+
+        BenchOperation("Check duplicate sale IDs (Bloom + confirm)", "O(N)",
+                       lambda c: partial(has_duplicate_sale_ids_bloom, c.records)),
+        BenchOperation("Find duplicate sale IDs (external, 1 MiB)", "O(N)",
+                       lambda c: partial(find_duplicate_sale_ids_external, c.ids, 1024 * 1024, tmp_dir=c.tmp_dir)),
+        BenchOperation("Estimate distinct sale IDs (HyperLogLog)", "O(N)",
+                       lambda c: partial(estimate_distinct_sale_ids, c.ids)),
+
+        # Same operations on slotted records with integer dates/cents
+        BenchOperation("Load (CSV -> compact list)", "O(N)",
+                       lambda c: partial(load_sales_csv, c.path, compact=True), runs=3, throughput=True),
+        BenchOperation("Retrieve latest sale (compact)", "O(N)",
+                       lambda c: partial(get_latest_sale_compact, c.compact_records)),
+        BenchOperation("Compute total revenue (compact)", "O(N)",
+                       lambda c: partial(compute_total_revenue_compact, c.compact_records)),
+        BenchOperation("Check duplicate sale IDs (compact)", "O(N) avg",
+                       lambda c: partial(has_duplicate_sale_ids, c.compact_records)),
+        BenchOperation("Search sale by ID (compact)", "O(N)",
+                       lambda c: partial(search_sale_by_id_linear, c.compact_records, c.target_id)),
+
+        # Same operations on the columnar representation
+        BenchOperation("Load (CSV -> table)", "O(N)", lambda c: partial(load_sales_table, c.path), runs=3,
+                       throughput=True),
+        BenchOperation("Retrieve latest sale (table)", "O(N)", lambda c: partial(get_latest_sale_table, c.table)),
+        BenchOperation("Compute total revenue (table)", "O(N)",
+                       lambda c: partial(compute_total_revenue_table, c.table)),
+        BenchOperation("Check duplicate sale IDs (table)", "O(N) avg",
+                       lambda c: partial(has_duplicate_sale_ids_table, c.table)),
+        BenchOperation("Search sale by ID (table)", "O(N)",
+                       lambda c: partial(search_sale_by_id_table, c.table, c.target_id)),
+        BenchOperation("Load (mmap)", "O(1)", lambda c: partial(load_sales_binary, c.bin_path)),
+
+        # Read + all four operations in one streaming pass
+        BenchOperation("Single-pass stream (all ops)", "O(N)",
+                       lambda c: lambda: aggregate_sales_stream(iter_sales_csv(c.path), c.target_id), runs=3),
+
+        # Id index: build cost, warm reload cost, then per-lookup and batch costs
+        BenchOperation("Build id index", "O(N log N)", lambda c: partial(SaleIdIndex.build, c.ids), runs=3),
+        BenchOperation("Load id index (persisted)", "O(N)", _load_id_index_setup),
+        BenchOperation("Search sale by ID (hash index)", "O(1) avg",
+                       lambda c: partial(search_sale_by_id_indexed, c.records, c.index, c.target_id, "hash")),
+        BenchOperation("Search sale by ID (sorted index)", "O(log N)",
+                       lambda c: partial(search_sale_by_id_indexed, c.records, c.index, c.target_id, "sorted")),
+        BenchOperation("Batch search 1,000 IDs (hash index)", "O(1) per ID",
+                       lambda c: partial(search_sales_by_ids_batch, c.records, c.index, c.batch_ids, "hash")),
+        BenchOperation("Batch search 1,000 IDs (sorted index)", "O(log N) per ID",
+                       lambda c: partial(search_sales_by_ids_batch, c.records, c.index, c.batch_ids, "sorted")),
+
+        BenchOperation("Incremental refresh (+50 rows)", "O(1) (O(appended))",
+                       _incremental_refresh_setup, one_shot=True),
+
+        # Top-K with a bounded heap vs a full sort
+        BenchOperation("Top 100 sales by amount (heap)", "O(N log K)",
+                       lambda c: partial(top_k_sales, c.records, 100)),
+        BenchOperation("Most recent 100 sales (heap)", "O(N log K)",
+                       lambda c: partial(most_recent_sales, c.records, 100)),
+        BenchOperation("Top 100 sales by amount (full sort)", "O(N log N)",
+                       lambda c: partial(top_k_sales_sorted, c.records, 100)),
+        BenchOperation("Top 100 sales by amount (streaming CSV)", "O(N log K)",
+                       lambda c: partial(top_k_sales_stream, c.path, 100), runs=3),
+
+        # Group-by: product has one group per row, day ~366 groups, month 12 groups
+        *(
+            BenchOperation(f"Group by {by} (hash, records)", f"O(N), G = {card}",
+                           lambda c, by=by: partial(group_sales, c.records, by))
+            for by, card in (("product", "N"), ("day", "366"), ("month", "12"))
+        ),
+        *(
+            BenchOperation(f"Group by {by} (columnar)", f"O(N), G = {card}",
+                           lambda c, by=by: partial(group_sales_table, c.table, by))
+            for by, card in (("product", "N"), ("day", "366"), ("month", "12"))
+        ),
+
+        # Date-range queries
+        BenchOperation("Build date index", "O(N log N)", lambda c: partial(SalesDateIndex, c.records), runs=3),
+        BenchOperation("Revenue between dates (scan)", "O(N)",
+                       lambda c: partial(revenue_between_scan, c.records, "2024-03-01", "2024-06-30")),
+        BenchOperation("Revenue between dates (date index)", "O(log N)",
+                       lambda c: partial(c.date_index.revenue_between, "2024-03-01", "2024-06-30")),
+        BenchOperation("Sales count on a day (date index)", "O(log N)",
+                       lambda c: partial(c.date_index.sales_count_on, "2024-05-15")),
+        BenchOperation("Latest sale before date (date index)", "O(log N)",
+                       lambda c: partial(c.date_index.latest_sale_before, "2024-07-01")),
+    ]
+    if workers > 1:
+        ops.append(BenchOperation(
+            f"Load (CSV -> list, {workers} procs)", "O(N)",
+            lambda c: partial(load_sales_csv_parallel, c.path, c.workers, executor=c.pool), runs=3,
+            throughput=True,
+        ))
+    return ops
+
+
+def run_operation(
+    op: BenchOperation,
+    ctx: BenchContext,
+    profile_prefix: str | None = None,
+    min_runs: int = 0,
+) -> Tuple[TimingResult, MemoryResult]:
+    """
+    Time first, then one traced call for memory (tracemalloc would skew timings).
+    With profile_prefix, profiles are captured last, also outside the timed calls.
+    min_runs raises the sample count (one-shot operations repeat their setup), e.g. so
+    results can be compared against a baseline.
+    """
+    if op.one_shot:
+        samples = [
+            measure(op.setup(ctx), runs=1, warmup=0, max_runs=1, loops=1).samples_ms[0]
+            for _ in range(max(1, min_runs))
+        ]
+        timing = TimingResult(samples)
+        mem = measure_memory(op.setup(ctx), ctx.n)
+        make_fn = partial(op.setup, ctx)
+    else:
+        fn = op.setup(ctx)
+        timing = measure(fn, runs=max(op.runs, min_runs), max_runs=max(50, min_runs))
+        mem = measure_memory(fn, ctx.n)
+        make_fn = lambda: fn
+    if profile_prefix:
+        capture_profiles(make_fn, *profile_paths(profile_prefix, op.name, ctx.n))
+    return timing, mem
+
+
+def load_generator_module():
+    """Import 0210_testdatageneration.py (its file name is not a valid module name)."""
+    gen_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "0210_testdatageneration.py")
+    spec = importlib.util.spec_from_file_location("testdatageneration", gen_path)
+    gen = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gen)
+    return gen
+
+
+def ensure_generated_dataset(n: int, data_dir: str) -> str:
+    """Return data_dir/sales_<n>_product.csv, generating it with 0210_testdatageneration.py if missing."""
+    path = os.path.join(data_dir, f"sales_{n}_product.csv")
+    if not os.path.exists(path):
+        load_generator_module().generate_sales_csv(n, path, duplicate_rate=0.0, seed=42, unique_product=True)
+    return path
+
+
+def generate_sales_records(n: int, **kwargs) -> List[SaleRecord]:
+    """
+    The rows generate_sales_csv(n, ..., **kwargs) would write, built in memory without
+    touching disk.
+    """
+    gen = load_generator_module()
+    return [
+        SaleRecord(sale_id, sale_date, float(amount), product)
+        for sale_id, sale_date, amount, product in gen.iter_sales_rows(n, **kwargs)
+    ]
+
+
+def select_operations(operations: List[BenchOperation], patterns: List[str] | None) -> List[BenchOperation]:
+    """Operations whose name matches any pattern (exact name or case-insensitive fnmatch glob)."""
+    if not patterns:
+        return operations
+    selected = [
+        op for op in operations
+        if any(op.name == p or fnmatch.fnmatch(op.name.lower(), p.lower()) for p in patterns)
+    ]
+    if not selected:
+        raise ValueError(f"no operation matches {patterns}; use --list-ops to see the names")
+    return selected
+
+
+def dataset_size(path: str) -> int:
+    """N from a name like sales_10000_product.csv, otherwise the number of data rows."""
+    m = re.search(r"sales_(\d+)_", os.path.basename(path))
+    if m:
+        return int(m.group(1))
+    with open_sales_file(path, binary=True) as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+def discover_datasets(patterns: List[str]) -> List[Tuple[int, str]]:
+    """(N, path) for every file matched by the glob patterns, smallest N first."""
+    paths = sorted({p for pattern in patterns for p in glob.glob(pattern)})
+    if not paths:
+        raise ValueError(f"no dataset matches {patterns}")
+    return sorted((dataset_size(p), p) for p in paths)
+
+
+def run_operation_isolated(
+    op_name: str,
+    path: str,
+    n: int,
+    workers: int,
+    profile_prefix: str | None = None,
+    min_runs: int = 0,
+    cache_dir: str | None = None,
+) -> Tuple[TimingResult, MemoryResult]:
+    """Run one (operation, dataset) pair in a fresh interpreter; see run_one()."""
+    cmd = [
+        sys.executable, os.path.abspath(__file__),
+        "--run-one", op_name, "--datasets", path, "--n", str(n), "--workers", str(workers),
+        "--min-runs", str(min_runs),
+    ]
+    if profile_prefix:
+        cmd += ["--profile-prefix", profile_prefix]
+    if cache_dir:
+        cmd += ["--cache-dir", cache_dir]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{op_name} on {path} failed:\n{proc.stderr}")
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+    return (
+        TimingResult(out["samples_ms"], out["loops"]),
+        MemoryResult(out["peak_bytes"], out["retained_bytes"], n),
+    )
+
+
+def run_one(
+    op_name: str,
+    path: str,
+    n: int,
+    workers: int,
+    profile_prefix: str | None = None,
+    min_runs: int = 0,
+    cache_dir: str | None = None,
+) -> None:
+    """Child side of run_operation_isolated: measure one pair and print it as one JSON line."""
+    ops = {op.name: op for op in benchmark_operations(workers)}
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = BenchContext(path, n, tmp, pool, workers, cache_dir=cache_dir)
+        timing, mem = run_operation(ops[op_name], ctx, profile_prefix, min_runs)
+    if pool is not None:
+        pool.shutdown()
+    print(json.dumps({**timing.to_dict(), **mem.to_dict()}))
+
+
+# -----------------------------
+# Main
+# -----------------------------
+DEFAULT_DATASETS = [
+    (100, "data/sales_100_product.csv"),
+    (1000, "data/sales_1000_product.csv"),
+    (10000, "data/sales_10000_product.csv"),
+    (100000, "data/sales_100000_product.csv"),
+]
+
+
+def main(
+    parallel_workers: int | None = None,
+    json_out: str | None = None,
+    baseline: str | None = None,
+    regression_threshold: float = 0.05,
+    refine_max_n: int = 0,
+    load_concurrency: int = 4,
+    datasets: List[Tuple[int, str]] | None = None,
+    op_patterns: List[str] | None = None,
+    isolate: bool = False,
+    jobs: int = 1,
+    history_db: str | None = None,
+    profile: bool = False,
+    cache_dir: str | None = None,
+):
+    """
+    parallel_workers    : process count for the parallel loader (None = all cores, 1 = skip it)
+    json_out            : write all timing samples and statistics to this JSON file
+    baseline            : earlier json_out file to compare against
+    regression_threshold: minimum relative slowdown reported as a regression
+    refine_max_n        : if > 0, operations whose complexity fit is ambiguous are re-measured
+                          on larger generated datasets (x10 steps) up to this many rows, as
+                          long as the candidate models predict distinguishable times there
+    load_concurrency    : how many dataset files are loaded at once before the operations run
+    datasets            : [(N, path), ...]; defaults to DEFAULT_DATASETS
+    op_patterns         : operation names or globs to run (default: all)
+    isolate             : run each (operation, dataset) pair in its own subprocess
+    jobs                : isolated pairs run concurrently (implies isolate when > 1)
+    history_db          : append this run to the SQLite benchmark history
+    profile             : also write a cProfile (.prof) and sampled collapsed stacks (.collapsed)
+                          per (operation, N), named <json_out stem>.<operation>.n<N>.*
+    cache_dir           : persistent SalesDatasetCache directory; datasets are loaded through
+                          it, so unchanged CSVs are parsed once across runs
+    """
+    files = datasets or DEFAULT_DATASETS
+    Ns: List[int] = [n for n, _ in files]
+    isolate = isolate or jobs > 1
+
+    workers = parallel_workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and not isolate else None
+    operations = select_operations(benchmark_operations(workers), op_patterns)
+    tmp_dir = tempfile.TemporaryDirectory()
+    # Profiles sit next to the JSON results and share their file name stem
+    profile_prefix = None
+    if profile:
+        profile_prefix = os.path.abspath(os.path.splitext(json_out)[0] if json_out else "benchmark")
+    # Results that are (or may become) a baseline need enough samples for the U test
+    min_runs = mann_whitney_min_samples() if (json_out or baseline) else 0
+
+    # Store times and memory per operation
+    times: Dict[str, List[TimingResult]] = {op.name: [] for op in operations}
+    memory: Dict[str, List[MemoryResult]] = {op.name: [] for op in operations}
+
+    if isolate:
+        # Every pair gets a fresh interpreter, so no GC/allocator state carries over
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as runner:
+            futures = {
+                (op.name, n): runner.submit(
+                    run_operation_isolated, op.name, path, n, workers, profile_prefix, min_runs, cache_dir
+                )
+                for n, path in files
+                for op in operations
+            }
+            for n, _ in files:
+                for op in operations:
+                    timing, mem = futures[(op.name, n)].result()
+                    times[op.name].append(timing)
+                    memory[op.name].append(mem)
+    else:
+        # Load every dataset up front with overlapping I/O and parsing
+        paths = [path for _, path in files]
+        start = time.perf_counter()
+        preloaded = load_sales_files_concurrently(paths, load_concurrency, executor=pool, cache_dir=cache_dir)
+        wall_ms = (time.perf_counter() - start) * 1000.0
+        serial_ms = sum(r.seconds for r in preloaded.values()) * 1000.0
+
+        print(f"\n=== Concurrent load ({len(paths)} files, concurrency {load_concurrency}) ===")
+        print(markdown_table(
+            ["File", "Rows", "Load (ms)", "Source"],
+            [[path, f"{len(r.records):,}", f"{r.seconds * 1000.0:.2f}", "cache" if r.from_cache else "parse"]
+             for path, r in preloaded.items()],
+        ))
+        print(f"Wall clock {wall_ms:.2f} ms vs {serial_ms:.2f} ms summed per file "
+              f"({serial_ms / wall_ms if wall_ms > 0 else float('nan'):.2f}x)")
+
+        # For each dataset size, run ops
+        for n, path in files:
+            ctx = BenchContext(
+                path, n, tmp_dir.name, pool, workers, records=preloaded.pop(path).records, cache_dir=cache_dir
+            )
+            for op in operations:
+                timing, mem = run_operation(op, ctx, profile_prefix, min_runs)
+                times[op.name].append(timing)
+                memory[op.name].append(mem)
+
+    # Points used for complexity fitting; refinement may add larger N per operation
+    fit_points: Dict[str, List[Tuple[int, TimingResult]]] = {
+        op: list(zip(Ns, results)) for op, results in times.items()
+    }
+
+    def fit(op: str) -> ComplexityReport:
+        # Per-point spread (IQR / median) decides which model differences are real
+        pts = fit_points[op]
+        return fit_complexity(
+            [n for n, _ in pts],
+            [r.median_ms for _, r in pts],
+            noise=[r.iqr_ms / r.median_ms if r.median_ms > 0 else 0.0 for _, r in pts],
+        )
+
+    if refine_max_n > Ns[-1]:
+        pending = [op for op in operations if fit(op.name).ambiguous]
+        for n_extra in suggest_extra_sizes(Ns, refine_max_n):
+            # Skip ops whose candidate models predict the same time at n_extra (within noise)
+            pending = [op for op in pending if fit(op.name).resolvable_at(n_extra)]
+            if not pending:
+                break
+            print(f"Refining {len(pending)} ambiguous fit(s) at N={n_extra:,} ...")
+            path = ensure_generated_dataset(n_extra, os.path.dirname(files[-1][1]))
+            ctx = BenchContext(path, n_extra, tmp_dir.name, pool, workers, cache_dir=cache_dir)
+            for op in pending:
+                if isolate:
+                    timing = run_operation_isolated(op.name, path, n_extra, workers, cache_dir=cache_dir)[0]
+                else:
+                    timing = run_operation(op, ctx)[0]
+                fit_points[op.name].append((n_extra, timing))
+            pending = [op for op in pending if fit(op.name).ambiguous]
+
+    if pool is not None:
+        pool.shutdown()
+    tmp_dir.cleanup()
+    if profile_prefix:
+        print(f"\nWrote .prof/.collapsed profiles as {profile_prefix}.<operation>.n<N>.*")
+
+    # -----------------------------
+    # Table 1: Raw timings (ms)
+    # -----------------------------
+    headers = ["Operation"] + [f"N={n:,}" for n in Ns]
+    rows = []
+    for op, results in times.items():
+        rows.append([op] + [f"{r.median_ms:.4f}" for r in results])
+
+    print("\n=== Performance Trends: Execution Time (ms, median) ===")
+    print(markdown_table(headers, rows))
+
+    headers_spread = [
+        "Operation", "Median (ms)", "IQR (ms)", "95% CI (median)", "Runs x loops",
+        "Peak (KiB)", "Retained (KiB)", "Retained B/row",
+    ]
+    rows_spread = []
+    for op, results in times.items():
+        r = results[-1]
+        m = memory[op][-1]
+        rows_spread.append([
+            op,
+            f"{r.median_ms:.4f}",
+            f"{r.iqr_ms:.4f}",
+            f"{r.ci_low_ms:.4f} - {r.ci_high_ms:.4f}",
+            f"{len(r.samples_ms)} x {r.loops}",
+            f"{m.peak_bytes / 1024:.1f}",
+            f"{m.retained_bytes / 1024:.1f}",
+            f"{m.bytes_per_row:.1f}",
+        ])
+
+    print(f"\n=== Spread and memory at N={Ns[-1]:,} ===")
+    print(markdown_table(headers_spread, rows_spread))
+
+    rows_tp = []
+    for op in operations:
+        if op.throughput:
+            rows_tp.append([op.name] + [
+                f"{n / (r.median_ms / 1000.0):,.0f}" if r.median_ms > 0 else "-"
+                for n, r in zip(Ns, times[op.name])
+            ])
+
+    if rows_tp:
+        print("\n=== Parser throughput (rows/s) ===")
+        print(markdown_table(headers, rows_tp))
+
+    # -----------------------------
+    # Table 2: Big-O expectation vs best-fitting complexity model
+    # -----------------------------
+    expected = {op.name: op.expected for op in operations}
+
+    headers2 = [
+        "Operation", "Expected Big-O", "Observed slope (log-log)",
+        "Lowest-error fit", "Fit error", "Runner-up", "Selected", "Max N", "Aligns?",
+    ]
+    rows2 = []
+    for op in times:
+        pts = fit_points[op]
+        slope = regression_slope_loglog([n for n, _ in pts], [r.median_ms for _, r in pts])
+        report = fit(op)
+        exp = expected[op]
+        if report.selected == base_complexity(exp):
+            aligns = "Yes"
+        elif base_complexity(exp) in report.candidates:
+            aligns = "Ambiguous (" + " / ".join(report.candidates) + ")"
+        else:
+            aligns = "No"
+        runner_up = report.fits[1] if len(pts) > 1 else report.fits[0]
+        rows2.append([
+            op,
+            exp,
+            f"{slope:.2f}",
+            report.best.model,
+            f"{report.best.rel_rmse:.1%}",
+            f"{runner_up.model} ({runner_up.rel_rmse:.1%})",
+            report.selected or "-",
+            f"{pts[-1][0]:,}",
+            aligns,
+        ])
+
+    print("\n=== Big-O Alignment (model fit) ===")
+    print(markdown_table(headers2, rows2))
+
+    # -----------------------------
+    # JSON output / baseline comparison
+    # -----------------------------
+    doc = results_to_json(Ns, times, memory)
+    if json_out:
+        with open(json_out, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"\nWrote {json_out}")
+
+    if history_db:
+        run_id = record_history(history_db, doc)
+        print(f"\nRecorded run {run_id} in {history_db}")
+
+    if baseline:
+        with open(baseline, "r", encoding="utf-8") as f:
+            base_doc = json.load(f)
+        flagged = compare_to_baseline(doc, base_doc, threshold=regression_threshold)
+        print(f"\n=== Regressions vs {baseline} ===")
+        if flagged:
+            print(markdown_table(
+                ["Operation", "N", "Baseline (ms)", "Current (ms)", "Ratio", "p-value", "Status"],
+                [[f["operation"], f"{f['n']:,}", f"{f['baseline_ms']:.4f}", f"{f['current_ms']:.4f}",
+                  f"{f['ratio']:.2f}x", f"{f['p_value']:.4f}", f["status"]] for f in flagged],
+            ))
+        else:
+            print("No statistically significant regressions.")
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark sales operations across dataset sizes.")
+    parser.add_argument("--datasets", nargs="+", metavar="GLOB",
+                        help="dataset files or glob patterns (default: data/sales_{100..100000}_product.csv)")
+    parser.add_argument("--ops", nargs="+", metavar="NAME",
+                        help="operation names or glob patterns, e.g. 'Load*' '*index*' (default: all)")
+    parser.add_argument("--list-ops", action="store_true", help="print the operation names and exit")
+    parser.add_argument("--isolate", action="store_true",
+                        help="run each (operation, dataset) pair in its own subprocess")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="isolated pairs to run at once (implies --isolate when > 1)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for the parallel CSV loader (default: all cores, 1 = skip it)")
+    parser.add_argument("--json-out", help="write all samples and statistics to this JSON file")
+    parser.add_argument("--baseline", help="earlier --json-out file to compare against")
+    parser.add_argument("--regression-threshold", type=float, default=0.05)
+    parser.add_argument("--refine-max-n", type=int, default=0,
+                        help="re-measure ambiguous complexity fits on generated datasets up to this N")
+    parser.add_argument("--load-concurrency", type=int, default=4)
+    parser.add_argument("--profile", action="store_true",
+                        help="write cProfile and collapsed-stack profiles per (operation, N) next to --json-out")
+    parser.add_argument("--history", metavar="DB", help="append results to this SQLite history database")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="persistent parsed-dataset cache; unchanged CSVs are not re-parsed on later runs")
+    parser.add_argument("--report", metavar="DB",
+                        help="print trends and regressions from a history database and exit")
+    parser.add_argument("--report-threshold", type=float, default=0.10,
+                        help="flag time/row above the rolling median by more than this fraction")
+    parser.add_argument("--report-window", type=int, default=5, help="runs in the rolling median")
+    # Internal: used by run_operation_isolated for the child process
+    parser.add_argument("--run-one", metavar="OPERATION", help=argparse.SUPPRESS)
+    parser.add_argument("--n", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--profile-prefix", help=argparse.SUPPRESS)
+    parser.add_argument("--min-runs", type=int, default=0, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def cli(argv: List[str] | None = None) -> None:
+    args = parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
+    if args.list_ops:
+        for op in benchmark_operations(workers):
+            print(f"{op.name}  [{op.expected}]")
+        return
+
+    if args.report:
+        table, regressions = history_report(args.report, args.report_threshold, args.report_window)
+        print(table)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.report_threshold:.0%}:")
+            for op, n in regressions:
+                print(f"- {op} (N={n:,})")
+            sys.exit(1)
+        return
+
+    if args.run_one:
+        path = args.datasets[0]
+        run_one(args.run_one, path, args.n if args.n is not None else dataset_size(path), workers,
+                args.profile_prefix, args.min_runs, args.cache_dir)
+        return
+
+    main(
+        parallel_workers=args.workers,
+        json_out=args.json_out,
+        baseline=args.baseline,
+        regression_threshold=args.regression_threshold,
+        refine_max_n=args.refine_max_n,
+        load_concurrency=args.load_concurrency,
+        datasets=discover_datasets(args.datasets) if args.datasets else None,
+        op_patterns=args.ops,
+        isolate=args.isolate,
+        jobs=args.jobs,
+        history_db=args.history,
+        profile=args.profile,
+        cache_dir=args.cache_dir,
+    )
+
 
 if __name__ == "__main__":
-    main()
+    cli()
@@ -1,11 +1,213 @@
 import csv
+import os
 import random
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, timedelta
 from pathlib import Path
+from typing import Iterator, List, Tuple
 
-def random_date(start: date, end: date) -> date:
+# batch エンジンはこの行数ごとに seed を切り替えるため、出力の一部（変えると結果も変わる）
+BATCH_ROWS = 65_536
+ENGINES = ("row", "batch")
+
+# (sale_id, sale_date, amount, product)
+Row = Tuple[int, str, str, str]
+
+def random_date(start: date, end: date, rng=random) -> date:
     delta_days = (end - start).days
-    return start + timedelta(days=random.randint(0, delta_days))
+    return start + timedelta(days=rng.randint(0, delta_days))
+
+def batch_rng(seed: int, batch_index: int) -> random.Random:
+    # str の seed は sha512 で決定的（PYTHONHASHSEED に依存しない）
+    return random.Random(f"{seed}:{batch_index}")
+
+MASK64 = (1 << 64) - 1
+
+def _mix64(x: int) -> int:
+    # splitmix64 の finalizer
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+    return x ^ (x >> 31)
+
+def is_duplicate_row(i: int, seed: int, threshold: int) -> bool:
+    """
+    行 i が重複行かどうか。(seed, i) のハッシュだけで決まるので、
+    どのシャード・バッチからでも他の行の状態を履歴なしで判定できる。行 0 は常にユニーク。
+    """
+    return i > 0 and _mix64((seed * 0x9E3779B97F4A7C15 + i) & MASK64) < threshold
+
+def duplicate_source(i: int, seed: int, threshold: int, rng: random.Random) -> int:
+    """
+    重複行 i の sale_id: [0, i) から行 j を引き、j も重複行なら [0, j) から引き直す。
+    ユニーク行 j の sale_id は j なので、必ず既に出力済みの id になる（シャード境界をまたいでもよい）。
+    """
+    j = int(rng.random() * i)
+    while is_duplicate_row(j, seed, threshold):
+        j = int(rng.random() * j)
+    return j
+
+def _iter_batches(
+    n: int,
+    first_batch: int,
+    stop_batch: int,
+    duplicate_rate: float,
+    seed: int,
+    start_date: date,
+    end_date: date,
+    amount_min: float,
+    amount_max: float,
+    unique_product: bool,
+) -> Iterator[List[Row]]:
+    """
+    batch エンジン: バッチ [first_batch, stop_batch) を BATCH_ROWS 行ずつ、列ごとにまとめて
+    乱数を引いて行のリストにする。メモリはバッチ1つ分で一定。
+    NumPy の代わりに random.Random.choices で列単位に生成する（標準ライブラリのみ）。
+    """
+    date_strs = [(start_date + timedelta(days=d)).isoformat() for d in range((end_date - start_date).days + 1)]
+    cents = range(round(amount_min * 100), round(amount_max * 100) + 1)
+    products = [f"Product_{p:02d}" for p in range(10)]
+    threshold = int(duplicate_rate * (1 << 64))
+
+    for b in range(first_batch, stop_batch):
+        start = b * BATCH_ROWS
+        stop = min(start + BATCH_ROWS, n)
+        m = stop - start
+        rng = batch_rng(seed, b)
+
+        ids = list(range(start, stop))
+        if threshold:
+            for k, i in enumerate(ids):
+                if is_duplicate_row(i, seed, threshold):
+                    ids[k] = duplicate_source(i, seed, threshold, rng)
+
+        dates = rng.choices(date_strs, k=m)
+        amounts = [f"{c // 100}.{c % 100:02d}" for c in rng.choices(cents, k=m)]
+        if unique_product:
+            names = [f"Product_{i:06d}" for i in range(start, stop)]
+        else:
+            names = rng.choices(products, k=m)
+
+        yield list(zip(ids, dates, amounts, names))
+
+def _write_batches(f, n: int, first_batch: int, stop_batch: int, *params) -> None:
+    for rows in _iter_batches(n, first_batch, stop_batch, *params):
+        # csv.writer と同じ "\r\n" 区切り（値にカンマ・引用符は含まれない）
+        f.write("".join(f"{i},{d},{a},{p}\r\n" for i, d, a, p in rows))
+
+def _iter_rows(
+    n: int,
+    duplicate_rate: float,
+    seed: int,
+    start_date: date,
+    end_date: date,
+    amount_min: float,
+    amount_max: float,
+    unique_product: bool,
+) -> Iterator[Row]:
+    """
+    row エンジン: 1行ずつ生成。ユニーク行には 0, 1, 2, ... と連番を振るので、
+    出力済みの id は常に range(next_id)。重複行はそこから引くだけで、履歴リストは持たない。
+    """
+    rng = random.Random(seed)
+    next_id = 0
+
+    for i in range(n):
+        # sale_id: 一部だけ重複させる
+        if next_id and rng.random() < duplicate_rate:
+            sale_id = rng.randrange(next_id)
+        else:
+            sale_id = next_id
+            next_id += 1
+
+        sale_dt = random_date(start_date, end_date, rng).isoformat()
+        amount = round(rng.uniform(amount_min, amount_max), 2)
+
+        # ★ product をユニークにする
+        # どんなに sale_id が重複しても product は i（行番号）でユニーク保証
+        if unique_product:
+            product = f"Product_{i:06d}"
+        else:
+            product = f"Product_{rng.randint(0, 9):02d}"  # 例：重複ありにしたい場合
+
+        yield (sale_id, sale_dt, f"{amount:.2f}", product)
+
+def iter_sales_rows(
+    n: int,
+    duplicate_rate: float = 0.0,
+    seed: int = 42,
+    start_date: date = date(2024, 1, 1),
+    end_date: date = date(2024, 12, 31),
+    amount_min: float = 1.00,
+    amount_max: float = 500.00,
+    unique_product: bool = True,
+    engine: str = "row",
+) -> Iterator[Row]:
+    """
+    generate_sales_csv と同じ行を (sale_id, sale_date, amount, product) のタプルで返す（ディスクを使わない）。
+    amount は CSV と同じ "12.34" 形式の文字列。
+    """
+    if not (0.0 <= duplicate_rate <= 1.0):
+        raise ValueError("duplicate_rate must be between 0.0 and 1.0")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    params = (duplicate_rate, seed, start_date, end_date, amount_min, amount_max, unique_product)
+    if engine == "batch":
+        for rows in _iter_batches(n, 0, -(-n // BATCH_ROWS), *params):
+            yield from rows
+    else:
+        yield from _iter_rows(n, *params)
+
+HEADER = "sale_id,sale_date,amount,product\r\n"
+
+def _generate_shard(part_path: str, header: bool, n: int, first_batch: int, stop_batch: int, *params) -> str:
+    # プロセスプールの各ワーカーで実行される（バッチ境界で区切った1シャード分）
+    with open(part_path, "w", newline="", encoding="utf-8") as f:
+        if header:
+            f.write(HEADER)
+        _write_batches(f, n, first_batch, stop_batch, *params)
+    return part_path
+
+def _generate_sharded(out_file: Path, n: int, workers: int, partitioned: bool, params: tuple) -> None:
+    """
+    バッチをワーカー数のシャードに分けて並列に書く。seed はバッチ単位なので、
+    出力はワーカー数に依存しない。
+    partitioned=False: part ファイルを out_file に連結して削除
+    partitioned=True : out_file をディレクトリとして part-00000.csv ... を（ヘッダ付きで）残す
+    """
+    n_batches = -(-n // BATCH_ROWS)
+    shards = max(1, min(workers, n_batches))
+    bounds = [n_batches * k // shards for k in range(shards + 1)]
+    if partitioned:
+        out_file.mkdir(parents=True, exist_ok=True)
+        parts = [str(out_file / f"part-{k:05d}.csv") for k in range(shards)]
+    else:
+        parts = [f"{out_file}.part-{k:05d}" for k in range(shards)]
+
+    ok = False
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_generate_shard, parts[k], partitioned, n, bounds[k], bounds[k + 1], *params)
+                for k in range(shards)
+            ]
+            for fut in futures:
+                fut.result()
+
+        if not partitioned:
+            with out_file.open("wb") as out:
+                out.write(HEADER.encode("utf-8"))
+                for part in parts:
+                    with open(part, "rb") as src:
+                        shutil.copyfileobj(src, out, 1 << 20)
+        ok = True
+    finally:
+        # 連結後の part、または失敗時に書きかけの part を残さない
+        if not (ok and partitioned):
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
 
 def generate_sales_csv(
     n: int,
@@ -17,43 +219,53 @@ def generate_sales_csv(
     amount_min: float = 1.00,
     amount_max: float = 500.00,
     unique_product: bool = True,   # ★追加
+    engine: str = "row",
+    workers: int = 1,
+    partitioned: bool = False,
 ) -> None:
+    """
+    engine="row"  : 1行ずつ random と writerow で書く（従来の出力）
+    engine="batch": BATCH_ROWS 行単位でまとめて生成・書き込み（大量データ向け）
+    出力は seed と engine が同じならバイト単位で同一。
+    workers > 1 (batch のみ): プロセスプールでシャードごとに生成。出力はワーカー数に依存しない。
+    partitioned: out_path をディレクトリとし、シャードを part-*.csv のまま残す。
+    """
     if not (0.0 <= duplicate_rate <= 1.0):
         raise ValueError("duplicate_rate must be between 0.0 and 1.0")
-
-    random.seed(seed)
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}")
+    if (workers > 1 or partitioned) and engine != "batch":
+        raise ValueError("sharded generation (workers > 1 / partitioned) requires engine='batch'")
 
     out_file = Path(out_path)
     out_file.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
 
-    unique_ids = list(range(n))
-    written_ids = []
+    if engine == "batch":
+        params = (duplicate_rate, seed, start_date, end_date, amount_min, amount_max, unique_product)
+        if workers > 1 or partitioned:
+            _generate_sharded(out_file, n, workers, partitioned, params)
+        else:
+            with out_file.open("w", newline="", encoding="utf-8") as f:
+                f.write(HEADER)
+                _write_batches(f, n, 0, -(-n // BATCH_ROWS), *params)
+        _report(out_file, n, duplicate_rate, unique_product, f"{engine}, workers={workers}", time.perf_counter() - t0)
+        return
 
     with out_file.open("w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(["sale_id", "sale_date", "amount", "product"])
+        writer.writerows(_iter_rows(n, duplicate_rate, seed, start_date, end_date, amount_min, amount_max, unique_product))
 
-        for i in range(n):
-            # sale_id: 一部だけ重複させる
-            if written_ids and random.random() < duplicate_rate:
-                sale_id = random.choice(written_ids)
-            else:
-                sale_id = unique_ids[i]
-
-            sale_dt = random_date(start_date, end_date).isoformat()
-            amount = round(random.uniform(amount_min, amount_max), 2)
-
-            # ★ product をユニークにする
-            # どんなに sale_id が重複しても product は i（行番号）でユニーク保証
-            if unique_product:
-                product = f"Product_{i:06d}"
-            else:
-                product = f"Product_{random.randint(0, 9):02d}"  # 例：重複ありにしたい場合
+    _report(out_file, n, duplicate_rate, unique_product, engine, time.perf_counter() - t0)
 
-            writer.writerow([sale_id, sale_dt, f"{amount:.2f}", product])
-            written_ids.append(sale_id)
 
-    print(f"Generated: {out_file} (n={n}, duplicate_rate={duplicate_rate}, unique_product={unique_product})")
+def _report(out_file: Path, n: int, duplicate_rate: float, unique_product: bool, engine: str, elapsed: float) -> None:
+    rate = n / elapsed if elapsed > 0 else float("inf")
+    print(
+        f"Generated: {out_file} (n={n}, duplicate_rate={duplicate_rate}, unique_product={unique_product}, "
+        f"engine={engine}) in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+    )
 
 
 if __name__ == "__main__":